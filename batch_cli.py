@@ -0,0 +1,273 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, TextIO
+
+from project_paths import add_project_paths
+
+add_project_paths()
+
+Job = dict[str, Any]
+
+# The key that marks a job made from a line that could not be parsed, and
+# holds the reason. JSON keys are always strings, so no job read from the
+# input can have it, and unlike a bare object() it survives being pickled
+# for a worker process.
+_PARSE_ERROR = ("parse_error",)
+
+
+def _run_n_queens(job: Job, stats) -> dict[str, Any]:
+    """
+    n: the size of the board.
+    method: "backtrack" (the default) for one solution, "min_conflicts" for
+    one solution on large boards, or "count" for the number of solutions.
+    """
+    n = int(job["n"])
+    method = job.get("method", "backtrack")
+
+    if method == "backtrack":
+        from queens_board import BitmaskQueensBoard, solve_n_queens
+
+        board = BitmaskQueensBoard(n)
+        solved = solve_n_queens(board, stats=stats)
+        return {"solved": solved, "queens": [list(queen) for queen in board.queens()] if solved else None}
+
+    if method == "min_conflicts":
+        from queens_csp import solve_min_conflicts
+
+        solution = solve_min_conflicts(n, seed=job.get("seed"), stats=stats)
+        return {"solved": True, "rows": solution.rows.tolist()}
+
+    if method == "count":
+        from queens_counting import count_n_queens_serial
+
+        # Counted in this process, since the jobs are already spread over the pool
+        summary = count_n_queens_serial(n, stats)
+        return {"total": summary.total, "unique": summary.unique}
+
+    raise ValueError(f"Unknown n_queens method {method!r}")
+
+
+def _run_jug(job: Job, stats) -> dict[str, Any]:
+    """
+    capacities: the capacity of each jug.
+    target: the volume any jug should end up holding, or a list with the
+    volume of every jug.
+    strategy: "bfs" (the default), "bidirectional", "a_star",
+    "reachability", or "classic" for JugPuzzle with two jugs.
+    """
+    capacities = tuple(int(capacity) for capacity in job["capacities"])
+    target = job["target"]
+    target = tuple(int(volume) for volume in target) if isinstance(target, list) else int(target)
+    strategy = job.get("strategy", "bfs")
+
+    if strategy == "classic":
+        from jug import Jug
+        from puzzle import JugPuzzle
+
+        if len(capacities) != 2 or not isinstance(target, int):
+            raise ValueError("The classic strategy needs two jugs and a single target volume")
+        outcome = JugPuzzle.solve_breadth_first_search(Jug(capacities[0]), Jug(capacities[1]), target, stats)
+        path = []
+        while outcome:
+            path.append((outcome.a.current_volume, outcome.b.current_volume))
+            outcome = outcome.parent
+        path.reverse()
+    elif strategy == "reachability":
+        from reachability import shortest_path
+
+        if not isinstance(target, int):
+            raise ValueError("The reachability strategy needs a single target volume")
+        path = shortest_path(capacities, target)
+    else:
+        from multi_jug import MultiJugPuzzle
+
+        puzzle = MultiJugPuzzle(capacities)
+        solvers: dict[str, Callable] = {
+            "bfs": puzzle.solve_breadth_first_search,
+            "bidirectional": puzzle.solve_bidirectional_search,
+            "a_star": puzzle.solve_a_star_search,
+        }
+        if strategy not in solvers:
+            raise ValueError(f"Unknown jug strategy {strategy!r}")
+        path = solvers[strategy](target, stats=stats)
+
+    if not path:
+        return {"solved": False, "path": None, "moves": None}
+    return {"solved": True, "path": [list(state) for state in path], "moves": len(path) - 1}
+
+
+def _run_sudoku(job: Job, stats) -> dict[str, Any]:
+    """
+    grid: an 81 character puzzle with 0 or '.' for the empty cells, or a
+    list of rows (of any box size with the dlx backend).
+    backend: one of the sudoku solver's BACKENDS.
+    """
+    from solver import DEFAULT_BACKEND, format_grid, parse_grid, solve
+
+    grid = job["grid"]
+    backend = job.get("backend", DEFAULT_BACKEND)
+    if isinstance(grid, str):
+        solution = solve(parse_grid(grid), backend, stats)
+        return {"solved": solution is not None, "solution": format_grid(solution) if solution else None}
+
+    solution = solve([[int(cell) for cell in row] for row in grid], backend, stats)
+    return {"solved": solution is not None, "solution": solution}
+
+
+def _run_tic_tac_toe(job: Job, stats) -> dict[str, Any]:
+    """
+    board: the squares row by row, as a string or a list, with 'X', 'O'
+    and ' ' or '.' for the empty ones.
+    rows, cols and k: the size of the board and the number in a row to win,
+    3, 3 and 3 by default. The classic board is played with expectimax,
+    the others with a time-limited alpha-beta search.
+    symbol: who is to move on other boards, 'O' by default.
+    time_limit: the time the alpha-beta search may take, in seconds.
+    """
+    import engine
+
+    rows, cols, k = int(job.get("rows", 3)), int(job.get("cols", 3)), int(job.get("k", 3))
+    cells = [engine.EMPTY if square == "." else square for square in job["board"]]
+    if len(cells) != rows * cols or any(square not in (engine.PLAYER, engine.OPPONENT, engine.EMPTY)
+                                        for square in cells):
+        raise ValueError(f"Expected {rows * cols} squares of 'X', 'O', ' ' or '.'")
+
+    if (rows, cols, k) == (3, 3, 3) and "symbol" not in job:
+        return {"move": engine.best_move(cells, stats)}
+
+    from mnk_game import MNKBoard, best_move
+
+    symbol = job.get("symbol", engine.OPPONENT)
+    result = best_move(MNKBoard.from_cells(cells, rows, cols, k), symbol, float(job.get("time_limit", 1.0)))
+    return {"move": result.move, "score": result.score, "depth": result.depth, "nodes": result.nodes,
+            "complete": result.complete}
+
+
+# The solver for each type of job
+HANDLERS: dict[str, Callable[[Job, Any], dict[str, Any]]] = {
+    "n_queens": _run_n_queens,
+    "jug": _run_jug,
+    "sudoku": _run_sudoku,
+    "tic_tac_toe": _run_tic_tac_toe,
+}
+
+
+def run_job(job: Job) -> dict[str, Any]:
+    """
+    Runs a single job, returning a record with its id, whether it succeeded,
+    its result or error, and how long it took. With "stats": true in the
+    job, the record also holds the search statistics.
+    """
+    record: dict[str, Any] = {"id": job.get("id"), "type": job.get("type")}
+    start = time.perf_counter()
+    try:
+        if _PARSE_ERROR in job:
+            raise ValueError(job[_PARSE_ERROR])
+        handler = HANDLERS.get(job.get("type"))
+        if handler is None:
+            raise ValueError(f"Unknown job type {job.get('type')!r}, expected one of {', '.join(HANDLERS)}")
+
+        stats = None
+        if job.get("stats"):
+            from search_stats import SearchStats
+            stats = SearchStats()
+
+        record["result"] = handler(job, stats)
+        record["ok"] = True
+        if stats is not None:
+            record["stats"] = stats.as_dict()
+    except Exception as e:
+        record["ok"] = False
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["elapsed"] = time.perf_counter() - start
+    return record
+
+
+def _run_chunk(jobs: list[Job]) -> list[dict[str, Any]]:
+    return [run_job(job) for job in jobs]
+
+
+def read_jobs(lines: Iterable[str]) -> Iterator[Job]:
+    """
+    Parses one JSON job per line, skipping blank lines. A line that is not a
+    JSON object becomes a job that fails with the reason when it is run.
+    """
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            job = json.loads(line)
+        except json.JSONDecodeError as e:
+            job = {"id": None, "type": None, _PARSE_ERROR: f"Line {number}: {e}"}
+        if not isinstance(job, dict):
+            job = {"id": None, "type": None, _PARSE_ERROR: f"Line {number}: Expected a JSON object"}
+        yield job
+
+
+def run_jobs(jobs: Iterable[Job], workers: int | None = None, chunksize: int = 16) -> Iterator[dict[str, Any]]:
+    """
+    Runs a stream of jobs across a pool of processes, yielding their records
+    in the same order as the jobs. Only a couple of chunks per worker are in
+    flight at a time, so the input is never read far ahead of the output.
+    With a single worker the jobs run in this process.
+    """
+    jobs = iter(jobs)
+    if workers == 1:
+        yield from map(run_job, jobs)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = 2 * workers
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+
+        while chunk := list(islice(jobs, chunksize)):
+            pending.append(executor.submit(_run_chunk, chunk))
+            if len(pending) >= max_in_flight:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run a stream of solver jobs given as one JSON object per line, writing one JSON result per line."
+    )
+    parser.add_argument("input", nargs="?", default="-", help="File of jobs, or - for standard input")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (1 runs in-process)")
+    parser.add_argument("--chunksize", type=int, default=16, help="Jobs sent to a worker at a time")
+    args = parser.parse_args()
+
+    source: TextIO = sys.stdin if args.input == "-" else open(args.input)
+    jobs = succeeded = 0
+    start = time.perf_counter()
+    try:
+        for record in run_jobs(read_jobs(source), args.workers, args.chunksize):
+            sys.stdout.write(json.dumps(record))
+            sys.stdout.write("\n")
+            # Flushed every time, so whatever reads the output sees each record as soon as it is ready
+            sys.stdout.flush()
+            jobs += 1
+            succeeded += record["ok"]
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Ran {jobs} job(s), {succeeded} succeeded, in {elapsed:.3f}s "
+        f"({jobs / elapsed if elapsed > 0 else 0.0:.1f} jobs/sec)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
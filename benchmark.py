@@ -0,0 +1,286 @@
+import argparse
+import fnmatch
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Callable
+
+from project_paths import add_project_paths
+from search_stats import SearchStats
+
+add_project_paths()
+
+# Sudoku puzzles from easy to hardest: the puzzle in sudoku/grid.py, three
+# made by sudoku/generator.py, a 17 clue puzzle and Arto Inkala's puzzle
+SUDOKU_CORPUS = [
+    "530070000600195000098000060800060003400803001700020006060000280000419005000080079",
+    "954300000001069000800050000605000830000000040000840000590600302030002016000000090",
+    "000270009000001700004300000000002063090030000021004008069007000745000900003000080",
+    "000005000000060007093008510826000000000000000030059060050006400000031970900002103",
+    "000000010400000000020000000000050407008000300001090000300400200050100000000806000",
+    "800000000003600000070090200050007000000045700000100030001000068008500010090000400",
+]
+
+# Tic-tac-toe positions for the computer to move from, as 'X' squares and 'O' squares
+EXPECTIMAX_POSITIONS = {
+    "empty": ((), ()),
+    "center": ((4,), ()),
+    "corner": ((0,), ()),
+    "midgame": ((0, 8), (4,)),
+}
+
+
+class Workload:
+    """
+    A fixed piece of work to time. Its run function takes an optional
+    SearchStats (see search_stats.py), which it passes on to the solver so
+    that the nodes expanded can be counted.
+    """
+
+    def __init__(self, name: str, run: Callable[[Any], None]):
+        self.name = name
+        self.run = run
+
+
+def _nqueens_count(n: int, stats=None):
+    from queens_counting import count_n_queens_serial
+
+    count_n_queens_serial(n, stats)
+
+
+def _nqueens_backtrack(n: int, stats=None):
+    from queens_board import BitmaskQueensBoard, solve_n_queens
+
+    solve_n_queens(BitmaskQueensBoard(n), stats=stats)
+
+
+def _nqueens_min_conflicts(n: int, stats=None):
+    from queens_csp import solve_min_conflicts
+
+    solve_min_conflicts(n, seed=0, stats=stats)
+
+
+def _jug_two(capacity_a: int, capacity_b: int, desired_volume: int, repeat: int, stats=None):
+    from jug import Jug
+    from puzzle import JugPuzzle
+
+    for _ in range(repeat):
+        JugPuzzle.solve_breadth_first_search(Jug(capacity_a), Jug(capacity_b), desired_volume, stats)
+
+
+def _jug_compact(capacity_a: int, capacity_b: int, desired_volume: int, stats=None):
+    from compact_puzzle import CompactJugPuzzle
+
+    puzzle = CompactJugPuzzle(capacity_a, capacity_b)
+    puzzle.breadth_first_search(puzzle.encode(0, 0), desired_volume, stats)
+
+
+def _jug_multi(capacities: tuple[int, ...], goal: int, method: str, repeat: int, stats=None):
+    from multi_jug import MultiJugPuzzle
+
+    for _ in range(repeat):
+        getattr(MultiJugPuzzle(capacities), method)(goal, stats=stats)
+
+
+def _jug_reachability(capacities: tuple[int, ...], stats=None):
+    from reachability import ReachabilityTable
+
+    table = ReachabilityTable(capacities)
+    if stats is not None:
+        # The table expands every state it reaches once, so those are its nodes
+        stats.nodes += len(table.parents)
+
+
+def _sudoku(backend: str, puzzles: list[str], stats=None):
+    from solver import parse_grid, solve
+
+    for line in puzzles:
+        if solve(parse_grid(line), backend, stats) is None:
+            raise RuntimeError(f"The {backend} backend did not solve {line}")
+
+
+def _expectimax(position: str, stats=None):
+    import engine
+
+    board = engine.new_board()
+    for symbol, squares in zip((engine.PLAYER, engine.OPPONENT), EXPECTIMAX_POSITIONS[position]):
+        for square in squares:
+            board[square] = symbol
+    engine.best_move(board, stats)
+
+
+def _alpha_beta(rows: int, cols: int, k: int, stats=None):
+    import engine
+    from mnk_game import AlphaBetaSearch, MNKBoard
+
+    search = AlphaBetaSearch(MNKBoard(rows, cols, k), engine.PLAYER, engine.OPPONENT, time_limit=None)
+    search.search()
+    if stats is not None:
+        # The search keeps its own count of the nodes it visits
+        stats.nodes += search.nodes
+
+
+def workloads() -> list[Workload]:
+    """The fixed workload matrix, in the order it is run."""
+    result = []
+    for n in (8, 10, 12):
+        result.append(Workload(f"nqueens-count-{n}", partial(_nqueens_count, n)))
+    result.append(Workload("nqueens-backtrack-18", partial(_nqueens_backtrack, 18)))
+    for n in (1000, 100_000):
+        result.append(Workload(f"nqueens-min-conflicts-{n}", partial(_nqueens_min_conflicts, n)))
+
+    # The small jug searches take well under a millisecond, so they are
+    # repeated (the x suffix) to take long enough to time reliably
+    result.append(Workload("jug-bfs-3-4-2-x1000", partial(_jug_two, 3, 4, 2, 1000)))
+    result.append(Workload("jug-compact-bfs-997-1009-500", partial(_jug_compact, 997, 1009, 500)))
+    result.append(Workload("jug-a-star-7-11-13-5-x200",
+                           partial(_jug_multi, (7, 11, 13), 5, "solve_a_star_search", 200)))
+    result.append(Workload("jug-bfs-7-11-13-5-x500",
+                           partial(_jug_multi, (7, 11, 13), 5, "solve_breadth_first_search", 500)))
+    result.append(Workload("jug-reachability-5-7-11-13", partial(_jug_reachability, (5, 7, 11, 13))))
+
+    for backend in ("bitmask", "propagation", "dlx"):
+        result.append(Workload(f"sudoku-{backend}", partial(_sudoku, backend, SUDOKU_CORPUS)))
+    # The plain backtracking backend takes too long on the hardest puzzles
+    result.append(Workload("sudoku-improved-easy", partial(_sudoku, "improved", SUDOKU_CORPUS[:1])))
+
+    for position in EXPECTIMAX_POSITIONS:
+        result.append(Workload(f"expectimax-{position}", partial(_expectimax, position)))
+    result.append(Workload("alpha-beta-4x4-3", partial(_alpha_beta, 4, 4, 3)))
+    return result
+
+
+def measure(workload: Workload, repeat: int = 3) -> dict[str, float | int | None]:
+    """
+    Times a workload, keeping the fastest of repeat runs, then runs it once
+    more under tracemalloc to find its peak memory use, and once more with
+    a SearchStats to count its nodes. Tracing and counting slow the code
+    down, so those runs are not timed.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        workload.run(None)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        workload.run(None)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    stats = SearchStats()
+    workload.run(stats)
+
+    wall_time = min(times)
+    return {
+        "wall_time": wall_time,
+        "peak_memory": peak_memory,
+        "nodes": stats.nodes,
+        "nodes_per_sec": stats.nodes / wall_time if wall_time > 0 else None,
+    }
+
+
+def run_benchmarks(patterns: list[str] | None = None, repeat: int = 3, verbose: bool = True) -> dict:
+    """
+    Runs the workloads whose names match any of the glob patterns, or all
+    of them, and returns the results in the format stored as a baseline.
+    """
+    results = {}
+    for workload in workloads():
+        if patterns and not any(fnmatch.fnmatch(workload.name, pattern) for pattern in patterns):
+            continue
+        results[workload.name] = measure(workload, repeat)
+        if verbose:
+            print(_format_result(workload.name, results[workload.name]), file=sys.stderr)
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def _format_result(name: str, result: dict) -> str:
+    rate = f"{result['nodes_per_sec']:>14,.0f}/s" if result["nodes_per_sec"] is not None else " " * 16
+    return f"{name:<32} {result['wall_time'] * 1000:>10.2f}ms {result['peak_memory'] / 1024:>10.0f}KiB {rate}"
+
+
+class Regression:
+    """A workload that got slower or used more memory than in the baseline."""
+
+    def __init__(self, name: str, metric: str, baseline: float, current: float):
+        self.name = name
+        self.metric = metric
+        self.baseline = baseline
+        self.current = current
+
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+    def __str__(self):
+        return f"{self.name}: {self.metric} {self.baseline:.6g} -> {self.current:.6g} ({self.ratio() - 1:+.1%})"
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.2, min_time: float = 0.005) -> list[Regression]:
+    """
+    Finds the workloads that regressed by more than threshold (as a
+    fraction) in wall time or peak memory. Time differences under min_time
+    seconds are ignored as noise.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+
+        if (result["wall_time"] > before["wall_time"] * (1 + threshold)
+                and result["wall_time"] - before["wall_time"] > min_time):
+            regressions.append(Regression(name, "wall_time", before["wall_time"], result["wall_time"]))
+        if result["peak_memory"] > before["peak_memory"] * (1 + threshold):
+            regressions.append(Regression(name, "peak_memory", before["peak_memory"], result["peak_memory"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the solvers on a fixed set of workloads.")
+    parser.add_argument("patterns", nargs="*", help="Only run the workloads matching these glob patterns")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per workload, keeping the fastest")
+    parser.add_argument("--save", metavar="PATH", help="Write the results to a JSON baseline file")
+    parser.add_argument("--compare", metavar="PATH", help="Flag regressions against a JSON baseline file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Fraction a metric may grow by before it is flagged")
+    parser.add_argument("--list", action="store_true", help="List the workloads and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for workload in workloads():
+            print(workload.name)
+        return
+
+    current = run_benchmarks(args.patterns, args.repeat)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(current, f, indent=2)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+from collections import deque
+from typing import Literal, Optional
+from jug import Jug
+
+# Sources and targets of a move besides the two jugs themselves
+TAP = -1
+SINK = -2
+
+# Every move pours as much as it can from a source into a target. Filling is
+# a transfer from the tap and emptying is a transfer into the sink. The order
+# matches JugPuzzle.outcomes so that both searches explore states alike.
+MOVES = (
+    (TAP, 0),  # fill a
+    (TAP, 1),  # fill b
+    (0, SINK),  # pour a away
+    (1, SINK),  # pour b away
+    (0, 1),  # transfer a to b
+    (1, 0),  # transfer b to a
+)
+
+
+class CompactOutcome:
+    """
+    A search node holding the state of both jugs packed into one integer,
+    a * (capacity of b + 1) + b, along with a link to its parent and its depth.
+    """
+
+    __slots__ = ("state", "parent", "depth", "base")
+
+    def __init__(self, state: int, base: int, parent=None, depth: int = 0):
+        self.state = state
+        self.base = base
+        self.parent: Optional[CompactOutcome] = parent
+        self.depth = depth
+
+    @property
+    def a(self) -> int:
+        return self.state // self.base
+
+    @property
+    def b(self) -> int:
+        return self.state % self.base
+
+    def __str__(self):
+        return f"({self.a}, {self.b})"
+
+    def __repr__(self):
+        return f"({self.a}, {self.b})"
+
+
+class CompactJugPuzzle:
+    """
+    Solves the same problem as JugPuzzle, but represents each state as a
+    packed integer and generates moves from the MOVES table instead of
+    allocating new Jug and Outcome objects for every expansion. This keeps
+    searches over jugs with very large capacities cheap.
+
+    The solutions returned can be printed with JugPuzzle.print_solution_path.
+    """
+
+    def __init__(self, capacity_a: int, capacity_b: int):
+        self.capacities = (capacity_a, capacity_b)
+        self.base = capacity_b + 1
+
+    def encode(self, a: int, b: int) -> int:
+        return a * self.base + b
+
+    def successors(self, state: int) -> list[int]:
+        """Returns the states reachable from the given state in one move."""
+        base = self.base
+        capacities = self.capacities
+        volumes = (state // base, state % base)
+        result = []
+
+        for source, target in MOVES:
+            if source == TAP:
+                amount = capacities[target] - volumes[target]
+            elif target == SINK:
+                amount = volumes[source]
+            else:
+                amount = min(volumes[source], capacities[target] - volumes[target])
+
+            if amount == 0:
+                continue
+
+            new_volumes = list(volumes)
+            if source != TAP:
+                new_volumes[source] -= amount
+            if target != SINK:
+                new_volumes[target] += amount
+
+            result.append(new_volumes[0] * base + new_volumes[1])
+
+        return result
+
+    def is_goal(self, state: int, desired_volume: int) -> bool:
+        return state // self.base == desired_volume or state % self.base == desired_volume
+
+    def breadth_first_search(self, start: int, desired_volume: int, stats=None) -> CompactOutcome | Literal[False]:
+        """
+        Finds a shortest sequence of moves to the desired volume.
+
+        :param stats: An optional SearchStats (see search_stats.py) that
+                      records the states expanded and the queue size.
+        """
+        base = self.base
+        root = CompactOutcome(start, base)
+        if self.is_goal(start, desired_volume):
+            return root
+
+        queue: deque[CompactOutcome] = deque([root])
+        visited = {start}
+
+        while queue:
+            current = queue.popleft()
+            if stats is not None:
+                stats.node(current.depth, current.state)
+
+            for state in self.successors(current.state):
+                if state in visited:
+                    continue
+                visited.add(state)
+
+                outcome = CompactOutcome(state, base, current, current.depth + 1)
+                if self.is_goal(state, desired_volume):
+                    return outcome
+                queue.append(outcome)
+
+            if stats is not None:
+                stats.frontier(len(queue))
+
+        return False
+
+    def depth_limited_search(self, start: int, desired_volume: int, max_depth: int,
+                             stats=None) -> list[CompactOutcome]:
+        """
+        Finds every sequence of at most max_depth moves ending at the desired volume.
+
+        :param stats: An optional SearchStats (see search_stats.py) that
+                      records the states expanded and the stack size.
+        """
+        base = self.base
+        all_solutions = []
+
+        stack = [CompactOutcome(start, base)]
+
+        while stack:
+            current = stack.pop()
+
+            if self.is_goal(current.state, desired_volume):
+                all_solutions.append(current)
+                continue
+
+            if current.depth >= max_depth:
+                continue
+
+            if stats is not None:
+                stats.node(current.depth, current.state)
+            for state in self.successors(current.state):
+                stack.append(CompactOutcome(state, base, current, current.depth + 1))
+
+            if stats is not None:
+                stats.frontier(len(stack))
+
+        return all_solutions
+
+    @staticmethod
+    def solve_breadth_first_search(a: Jug, b: Jug, desired_volume=2, stats=None) -> CompactOutcome | Literal[False]:
+        """Solves using breadth first search"""
+        puzzle = CompactJugPuzzle(a.max_capacity, b.max_capacity)
+        return puzzle.breadth_first_search(puzzle.encode(a.current_volume, b.current_volume), desired_volume, stats)
+
+    @staticmethod
+    def solve_depth_limited_search(a: Jug, b: Jug, desired_volume=2, max_depth=4,
+                                   stats=None) -> list[CompactOutcome]:
+        """Solves using depth limited search"""
+        puzzle = CompactJugPuzzle(a.max_capacity, b.max_capacity)
+        return puzzle.depth_limited_search(
+            puzzle.encode(a.current_volume, b.current_volume), desired_volume, max_depth, stats
+        )
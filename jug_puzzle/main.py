@@ -1,3 +1,5 @@
+from itertools import islice
+
 from jug import Jug
 from puzzle import JugPuzzle
 
@@ -11,7 +13,7 @@ def main():
     else:
         print("No solution found")
 
-    print("Depth-limited search")
+    print("Iterative deepening search")
 
     depth = 6
     depthInput = input(
@@ -21,19 +23,20 @@ def main():
     if depthInput != "":
         depth = int(depthInput)
 
-    solutions = JugPuzzle.solve_depth_limited_search(Jug(3), Jug(4), max_depth=depth)
-
-    if len(solutions) > 0:
-        print(f"Found {len(solutions)} solution(s)")
+    solutions = JugPuzzle.solve_iterative_deepening_search(
+        Jug(3), Jug(4), max_depth=depth
+    )
 
-        if len(solutions) > 10:
-            print("Printing only the first 10 solutions")
-            solutions = solutions[:10]
+    # Solutions are generated lazily, so only the ones printed, and one more
+    # to tell whether any were left out, are searched for
+    solutions = list(islice(solutions, 11))
+    for solution in solutions[:10]:
+        JugPuzzle.print_solution_path(solution)
 
-        for solution in solutions:
-            JugPuzzle.print_solution_path(solution)
-    else:
+    if not solutions:
         print("No solution found")
+    elif len(solutions) > 10:
+        print("Printed only the first 10 solutions")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,325 @@
+import heapq
+from collections import deque
+from itertools import count
+from math import gcd
+from typing import Iterator, Literal
+
+from compact_puzzle import SINK, TAP
+
+State = tuple[int, ...]
+Path = list[State]
+
+
+class MultiJugPuzzle:
+    """
+    Solves water jug puzzles with any number of jugs. A state is a tuple
+    holding the volume of each jug, and a move fills a jug from the tap,
+    pours a jug away, or transfers as much water as fits from one jug
+    into another.
+
+    A goal is either a volume that any one of the jugs should hold, or a
+    tuple giving the volume every jug should hold.
+    """
+
+    def __init__(self, capacities: tuple[int, ...]):
+        if not capacities or min(capacities) <= 0:
+            raise ValueError("Every jug should have a positive capacity")
+
+        self.capacities = tuple(capacities)
+
+        jugs = range(len(self.capacities))
+        self.moves = (
+            [(TAP, i) for i in jugs]
+            + [(i, SINK) for i in jugs]
+            + [(i, j) for i in jugs for j in jugs if i != j]
+        )
+
+    def empty_state(self) -> State:
+        return (0,) * len(self.capacities)
+
+    def successors(self, state: State) -> list[State]:
+        """Returns the states reachable from the given state in one move."""
+        capacities = self.capacities
+        result = []
+
+        for source, target in self.moves:
+            if source == TAP:
+                amount = capacities[target] - state[target]
+            elif target == SINK:
+                amount = state[source]
+            else:
+                amount = min(state[source], capacities[target] - state[target])
+
+            if amount == 0:
+                continue
+
+            new_state = list(state)
+            if source != TAP:
+                new_state[source] -= amount
+            if target != SINK:
+                new_state[target] += amount
+
+            result.append(tuple(new_state))
+
+        return result
+
+    def predecessors(self, state: State, start: State) -> Iterator[State]:
+        """
+        Generates the states from which the given state can be reached in one
+        move. Only states that could themselves have been reached from start
+        are generated: every volume is a multiple of the gcd of the
+        capacities and the starting volumes, and unless it is the start, at
+        least one jug is either empty or full, since every move leaves the
+        jug it touches in one of those conditions.
+        """
+        capacities = self.capacities
+        step = self.volume_step(start)
+        jugs = range(len(capacities))
+
+        def on_boundary(jug: int) -> bool:
+            return state[jug] == 0 or state[jug] == capacities[jug]
+
+        def candidates(changed: tuple[int, ...], options: range, wanted: tuple[int, ...]) -> Iterator[int]:
+            # When no untouched jug is empty or full, only the options that
+            # leave a changed jug empty or full, or recreate the start, can
+            # have been reached, so there is no need to try every option.
+            if any(on_boundary(jug) for jug in jugs if jug not in changed):
+                return iter(options)
+            return iter(sorted(v for v in set(wanted) if v in options))
+
+        for i, capacity in enumerate(capacities):
+            # Undo filling jug i
+            if state[i] == capacity:
+                for volume in candidates((i,), range(0, capacity, step), (0, start[i])):
+                    candidate = state[:i] + (volume,) + state[i + 1:]
+                    if self._plausible(candidate, start):
+                        yield candidate
+
+            # Undo pouring jug i away
+            if state[i] == 0:
+                for volume in candidates((i,), range(step, capacity + 1, step), (capacity, start[i])):
+                    candidate = state[:i] + (volume,) + state[i + 1:]
+                    if self._plausible(candidate, start):
+                        yield candidate
+
+        # Undo a transfer from jug i to jug j, which leaves i empty or j full
+        for i, capacity_i in enumerate(capacities):
+            for j, capacity_j in enumerate(capacities):
+                if i == j or not (state[i] == 0 or state[j] == capacity_j):
+                    continue
+
+                amounts = range(step, min(state[j], capacity_i - state[i]) + 1, step)
+                wanted = (capacity_i - state[i], state[j], start[i] - state[i])
+                for amount in candidates((i, j), amounts, wanted):
+                    candidate = list(state)
+                    candidate[i] += amount
+                    candidate[j] -= amount
+                    candidate = tuple(candidate)
+                    if self._plausible(candidate, start):
+                        yield candidate
+
+    def _plausible(self, state: State, start: State) -> bool:
+        if state == start:
+            return True
+        return any(v == 0 or v == c for v, c in zip(state, self.capacities))
+
+    def volume_step(self, start: State) -> int:
+        """Every reachable volume is a multiple of this (Bezout's identity)."""
+        return gcd(*self.capacities, *start)
+
+    def is_feasible(self, goal: int | State, start: State | None = None) -> bool:
+        """
+        Checks the conditions a goal must meet to be reachable at all, so that
+        impossible goals are rejected without searching.
+        """
+        start = start or self.empty_state()
+        step = self.volume_step(start)
+
+        if isinstance(goal, int):
+            return 0 <= goal <= max(self.capacities) and goal % step == 0
+
+        if len(goal) != len(self.capacities):
+            return False
+        if goal == start:
+            return True
+        if any(v < 0 or v > c or v % step != 0 for v, c in zip(goal, self.capacities)):
+            return False
+        return any(v == 0 or v == c for v, c in zip(goal, self.capacities))
+
+    @staticmethod
+    def is_goal(state: State, goal: int | State) -> bool:
+        if isinstance(goal, int):
+            return goal in state
+        return state == goal
+
+    @staticmethod
+    def _path(parents: dict[State, State | None], state: State) -> Path:
+        path = []
+        while state is not None:
+            path.append(state)
+            state = parents[state]
+        path.reverse()
+        return path
+
+    def solve_breadth_first_search(self, goal: int | State, start: State | None = None,
+                                   stats=None) -> Path | Literal[False]:
+        """
+        Solves using breadth first search
+
+        :param stats: An optional SearchStats (see search_stats.py) that
+                      records the states expanded and the queue size.
+        """
+        start = start or self.empty_state()
+        if not self.is_feasible(goal, start):
+            return False
+        if self.is_goal(start, goal):
+            return [start]
+
+        parents: dict[State, State | None] = {start: None}
+        queue: deque[State] = deque([start])
+        # The depth of each state, only kept when there are stats to record it in
+        depths = {start: 0}
+
+        while queue:
+            current = queue.popleft()
+            if stats is not None:
+                stats.node(depths[current], current)
+
+            for state in self.successors(current):
+                if state in parents:
+                    continue
+                parents[state] = current
+                if self.is_goal(state, goal):
+                    return self._path(parents, state)
+                queue.append(state)
+                if stats is not None:
+                    depths[state] = depths[current] + 1
+
+            if stats is not None:
+                stats.frontier(len(queue))
+
+        return False
+
+    def solve_bidirectional_search(self, goal: State, start: State | None = None,
+                                   stats=None) -> Path | Literal[False]:
+        """
+        Solves using breadth first searches run forwards from the start and
+        backwards from the goal at the same time, always growing whichever
+        frontier is smaller. The goal has to give the volume of every jug.
+
+        :param stats: An optional SearchStats (see search_stats.py) that
+                      records the states expanded, at their depth from the
+                      end their search started at, and the frontier sizes.
+        """
+        start = start or self.empty_state()
+        if isinstance(goal, int):
+            raise TypeError("Bidirectional search needs the volume of every jug in the goal")
+        if not self.is_feasible(goal, start):
+            return False
+        if start == goal:
+            return [start]
+
+        forward_parents: dict[State, State | None] = {start: None}
+        backward_parents: dict[State, State | None] = {goal: None}
+        forward_depth = {start: 0}
+        backward_depth = {goal: 0}
+        forward_frontier = [start]
+        backward_frontier = [goal]
+
+        while forward_frontier and backward_frontier:
+            if len(forward_frontier) <= len(backward_frontier):
+                expand, parents, depth, other_depth = self.successors, forward_parents, forward_depth, backward_depth
+                frontier = forward_frontier
+            else:
+                expand = lambda state: self.predecessors(state, start)
+                parents, depth, other_depth = backward_parents, backward_depth, forward_depth
+                frontier = backward_frontier
+
+            next_frontier = []
+            meeting = None
+            for current in frontier:
+                if stats is not None:
+                    stats.node(depth[current], current)
+                for state in expand(current):
+                    if state in parents:
+                        continue
+                    parents[state] = current
+                    depth[state] = depth[current] + 1
+                    next_frontier.append(state)
+
+                    # Finish the whole level so the shortest meeting point wins
+                    if state in other_depth:
+                        length = depth[state] + other_depth[state]
+                        if meeting is None or length < meeting[0]:
+                            meeting = (length, state)
+
+            if stats is not None:
+                stats.frontier(len(next_frontier))
+
+            if meeting is not None:
+                state = meeting[1]
+                path = self._path(forward_parents, state)
+                state = backward_parents[state]
+                while state is not None:
+                    path.append(state)
+                    state = backward_parents[state]
+                return path
+
+            if frontier is forward_frontier:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+
+        return False
+
+    def heuristic(self, state: State, goal: int | State) -> int:
+        """
+        A lower bound on the number of moves left. A single move changes the
+        volume of at most two jugs, so reaching a full goal state needs at
+        least half as many moves as there are jugs with the wrong volume.
+        """
+        if isinstance(goal, int):
+            return 0 if goal in state else 1
+        differences = sum(1 for v, g in zip(state, goal) if v != g)
+        return (differences + 1) // 2
+
+    def solve_a_star_search(self, goal: int | State, start: State | None = None,
+                            stats=None) -> Path | Literal[False]:
+        """
+        Solves using A* search, counting every move as a cost of one
+
+        :param stats: An optional SearchStats (see search_stats.py) that
+                      records the states expanded and the queue size.
+        """
+        start = start or self.empty_state()
+        if not self.is_feasible(goal, start):
+            return False
+
+        parents: dict[State, State | None] = {start: None}
+        costs = {start: 0}
+        # The counter breaks ties in insertion order without comparing states
+        tie_breaker = count()
+        queue = [(self.heuristic(start, goal), next(tie_breaker), start)]
+
+        while queue:
+            _, _, current = heapq.heappop(queue)
+            if self.is_goal(current, goal):
+                return self._path(parents, current)
+            if stats is not None:
+                stats.node(costs[current], current)
+
+            cost = costs[current] + 1
+            for state in self.successors(current):
+                if cost < costs.get(state, cost + 1):
+                    costs[state] = cost
+                    parents[state] = current
+                    heapq.heappush(queue, (cost + self.heuristic(state, goal), next(tie_breaker), state))
+
+            if stats is not None:
+                stats.frontier(len(queue))
+
+        return False
+
+    @staticmethod
+    def print_solution_path(path: Path):
+        print(" -> ".join(f"({', '.join(map(str, state))})" for state in path))
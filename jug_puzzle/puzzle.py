@@ -1,6 +1,15 @@
-from collections import deque
-from typing import Literal, Optional
+from typing import Iterator, Literal, Optional
 from jug import Jug
+from multi_jug import MultiJugPuzzle
+
+# Puts the repository root, where the search engine lives, on sys.path
+import search_path  # noqa: F401
+from search_engine import (
+    SearchProblem,
+    breadth_first_search,
+    depth_limited_search,
+    iterative_deepening_search,
+)
 
 
 class Outcome:
@@ -9,10 +18,19 @@ class Outcome:
         self.b = b
         self.parent: Optional[Outcome] = parent
 
+    @property
+    def parent(self) -> Optional["Outcome"]:
+        return self._parent
+
+    @parent.setter
+    def parent(self, parent: Optional["Outcome"]):
+        # The depth is stored when the parent is linked, so depth() does not
+        # have to walk the whole chain back to the start every time.
+        self._parent = parent
+        self._depth = 0 if parent is None else parent._depth + 1
+
     def depth(self) -> int:
-        if self.parent is None:
-            return 0
-        return 1 + self.parent.depth()
+        return self._depth
 
     def __eq__(self, other):
         return self.a == other.a and self.b == other.b
@@ -33,127 +51,94 @@ class JugPuzzle:
     (i.e do not have measurement markings) 3 and 4 liter jugs
     """
 
-    @staticmethod
-    def fill_jug(a: Jug, b: Jug, rev=False) -> Outcome:
-        if rev:
-            return Outcome(
-                Jug(b.max_capacity, b.current_volume),
-                Jug(a.max_capacity, a.max_capacity),
-            )
-        return Outcome(
-            Jug(a.max_capacity, a.max_capacity), Jug(b.max_capacity, b.current_volume)
-        )
-
-    @staticmethod
-    def pour(a: Jug, b: Jug, rev=False) -> Outcome:
-        if rev:
-            return Outcome(Jug(b.max_capacity, b.current_volume), Jug(a.max_capacity))
-        return Outcome(Jug(a.max_capacity), Jug(b.max_capacity, b.current_volume))
-
-    @staticmethod
-    def transfer(a: Jug, b: Jug, rev=False) -> Outcome:
-        transferrable_volume = b.max_capacity - b.current_volume
-        volume_transferred = (
-            a.current_volume
-            if a.current_volume <= transferrable_volume
-            else transferrable_volume
-        )
-
-        b_new_volume = b.current_volume + volume_transferred
-        a_new_volume = a.current_volume - volume_transferred
-
-        if rev:
-            return Outcome(
-                Jug(b.max_capacity, b_new_volume), Jug(a.max_capacity, a_new_volume)
-            )
-        else:
-            return Outcome(
-                Jug(a.max_capacity, a_new_volume), Jug(b.max_capacity, b_new_volume)
-            )
-
     @staticmethod
     def outcomes(a: Jug, b: Jug) -> list[Outcome]:
-        outcome_list: list[Outcome] = []
+        """
+        Returns the outcomes of every move from the given jugs: filling
+        either jug, emptying either jug, and pouring either into the other.
+        """
+        puzzle = MultiJugPuzzle((a.max_capacity, b.max_capacity))
+        return [
+            Outcome(Jug(a.max_capacity, volume_a), Jug(b.max_capacity, volume_b))
+            for volume_a, volume_b in puzzle.successors((a.current_volume, b.current_volume))
+        ]
 
-        if a.can_fill():
-            outcome_list.append(JugPuzzle.fill_jug(a, b))
-        if b.can_fill():
-            outcome_list.append(JugPuzzle.fill_jug(b, a, rev=True))
+    @staticmethod
+    def problem(a: Jug, b: Jug, desired_volume=2) -> SearchProblem:
+        """
+        Describes the puzzle for the search engine. A state is a pair holding
+        the volume of each jug, with the same moves as outcomes().
+        """
+        puzzle = MultiJugPuzzle((a.max_capacity, b.max_capacity))
 
-        if a.can_pour():
-            outcome_list.append(JugPuzzle.pour(a, b))
-        if b.can_pour():
-            outcome_list.append(JugPuzzle.pour(b, a, rev=True))
+        def is_goal(state: tuple[int, int]) -> bool:
+            return desired_volume in state
 
-        if a.can_transfer(b):
-            outcome_list.append(JugPuzzle.transfer(a, b))
-        if b.can_transfer(a):
-            outcome_list.append(JugPuzzle.transfer(b, a, rev=True))
+        return SearchProblem((a.current_volume, b.current_volume), puzzle.successors, is_goal)
 
-        return outcome_list
+    @staticmethod
+    def to_outcome(a: Jug, b: Jug, path: list[tuple[int, int]]) -> Outcome:
+        """Links the states of a path found by the search engine into a chain of Outcomes."""
+        outcome = None
+        for volume_a, volume_b in path:
+            outcome = Outcome(Jug(a.max_capacity, volume_a), Jug(b.max_capacity, volume_b), outcome)
+        return outcome
 
     @staticmethod
     def solve_breadth_first_search(
-        a: Jug, b: Jug, desired_volume=2
+        a: Jug, b: Jug, desired_volume=2, stats=None
     ) -> Outcome | Literal[False]:
-        """Solves using breadth first search"""
-        start = Outcome(a, b)
-
-        queue: deque[Outcome] = deque()
-        queue.append(start)
+        """
+        Solves using breadth first search
 
-        visited = set()
-        visited.add(start)
-
-        while len(queue) > 0:
-            current = queue.popleft()
-            if (
-                current.a.current_volume == desired_volume
-                or current.b.current_volume == desired_volume
-            ):
-                return current
-
-            outcomes = JugPuzzle.outcomes(current.a, current.b)
-            visited.add(current)
-
-            for outcome in outcomes:
-                if outcome not in visited:
-                    outcome.parent = current
-                    queue.append(outcome)
-
-        return False
+        :param stats: An optional SearchStats (see search_stats.py) that
+                      records the states expanded and the queue size.
+        """
+        path = breadth_first_search(JugPuzzle.problem(a, b, desired_volume), stats)
+        return JugPuzzle.to_outcome(a, b, path) if path else False
 
     @staticmethod
     def solve_depth_limited_search(
         a: Jug, b: Jug, desired_volume=2, max_depth=4
     ) -> list[Outcome]:
-        all_solutions = []
-
-        start = Outcome(a, b)
-
-        stack: deque[Outcome] = deque()
-        stack.append(start)
-
-        while len(stack) > 0:
-            current = stack.pop()
-
-            if (
-                current.a.current_volume == desired_volume
-                or current.b.current_volume == desired_volume
-            ):
-                all_solutions.append(current)
-                continue
-
-            if current.depth() >= max_depth:
-                continue
-
-            outcomes = JugPuzzle.outcomes(current.a, current.b)
-            for outcome in outcomes:
-                outcome.parent = current
-                stack.append(outcome)
+        problem = JugPuzzle.problem(a, b, desired_volume)
+        all_solutions: list[Outcome] = []
+        # The states and Outcomes of the last solution. Paths come in depth
+        # first order, so each one shares the longest start with the last,
+        # and the solutions share their Outcomes as a tree does.
+        states: list[tuple[int, int]] = []
+        chain: list[Outcome] = []
+
+        for path in depth_limited_search(problem, max_depth):
+            shared = 0
+            while shared < min(len(states), len(path)) and states[shared] == path[shared]:
+                shared += 1
+            del states[shared:], chain[shared:]
+
+            for volume_a, volume_b in path[shared:]:
+                parent = chain[-1] if chain else None
+                chain.append(Outcome(Jug(a.max_capacity, volume_a), Jug(b.max_capacity, volume_b), parent))
+                states.append((volume_a, volume_b))
+            all_solutions.append(chain[-1])
 
         return all_solutions
 
+    @staticmethod
+    def solve_iterative_deepening_search(
+        a: Jug, b: Jug, desired_volume=2, max_depth=4, stats=None
+    ) -> Iterator[Outcome]:
+        """
+        Yields solutions using iterative deepening search, one for each distinct
+        goal state reachable within max_depth moves, shallowest first.
+
+        An optional SearchStats (see search_stats.py) records the states
+        expanded, the stack size, and each state cut off at the depth limit
+        as a backtrack.
+        """
+        problem = JugPuzzle.problem(a, b, desired_volume)
+        for path in iterative_deepening_search(problem, max_depth, stats):
+            yield JugPuzzle.to_outcome(a, b, path)
+
     def print_solution_path(solution: Outcome):
         solution_list: list[Outcome] = []
 
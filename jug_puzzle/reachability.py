@@ -0,0 +1,103 @@
+from collections import OrderedDict, deque
+from typing import Literal
+
+from multi_jug import MultiJugPuzzle, Path, State
+
+
+class ReachabilityTable:
+    """
+    The shortest-path tree of every state reachable from empty jugs with the
+    given capacities, built by a single breadth first search. Any volume
+    that can be measured can then be looked up without searching again.
+    """
+
+    def __init__(self, capacities: tuple[int, ...]):
+        self.capacities = tuple(capacities)
+        puzzle = MultiJugPuzzle(self.capacities)
+
+        start = puzzle.empty_state()
+        self.parents: dict[State, State | None] = {start: None}
+        # The first state found holding each volume is one of the closest
+        self.nearest: dict[int, State] = {0: start}
+
+        queue: deque[State] = deque([start])
+        while queue:
+            current = queue.popleft()
+            for state in puzzle.successors(current):
+                if state in self.parents:
+                    continue
+                self.parents[state] = current
+                for volume in state:
+                    if volume not in self.nearest:
+                        self.nearest[volume] = state
+                queue.append(state)
+
+    def volumes(self) -> list[int]:
+        """Returns every volume that can be measured."""
+        return sorted(self.nearest)
+
+    def path(self, desired_volume: int) -> Path | Literal[False]:
+        """Returns a shortest sequence of states ending with a jug holding the desired volume."""
+        state = self.nearest.get(desired_volume)
+        if state is None:
+            return False
+
+        path = []
+        while state is not None:
+            path.append(state)
+            state = self.parents[state]
+        path.reverse()
+        return path
+
+
+class ReachabilityCache:
+    """
+    A bounded cache of reachability tables, keyed by the jug capacities and
+    evicting the least recently used table once full.
+    """
+
+    def __init__(self, maxsize: int = 32):
+        self.maxsize = maxsize
+        self._tables: OrderedDict[tuple[int, ...], ReachabilityTable] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def table(self, capacities: tuple[int, ...]) -> ReachabilityTable:
+        key = tuple(capacities)
+
+        table = self._tables.get(key)
+        if table is not None:
+            self.hits += 1
+            self._tables.move_to_end(key)
+            return table
+
+        self.misses += 1
+        table = ReachabilityTable(key)
+        self._tables[key] = table
+        if len(self._tables) > self.maxsize:
+            self._tables.popitem(last=False)
+        return table
+
+    def path(self, capacities: tuple[int, ...], desired_volume: int) -> Path | Literal[False]:
+        return self.table(capacities).path(desired_volume)
+
+    def info(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "maxsize": self.maxsize,
+            "currsize": len(self._tables),
+        }
+
+    def clear(self):
+        self._tables.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+default_cache = ReachabilityCache()
+
+
+def shortest_path(capacities: tuple[int, ...], desired_volume: int) -> Path | Literal[False]:
+    """Looks up a shortest solution using the shared default cache."""
+    return default_cache.path(capacities, desired_volume)
@@ -0,0 +1,11 @@
+import os
+import sys
+
+# The search engine is shared by all the puzzles, so it lives in the
+# repository root. Importing this module puts the root on sys.path, which
+# lets the jug puzzle's modules be imported from this directory as well as
+# through project_paths.py from the root.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
@@ -1,6 +1,6 @@
 import sys
 
-from queens_board import QueensBoard, solve_n_queens
+from queens_board import BitmaskQueensBoard, solve_n_queens
 
 
 def main():
@@ -10,7 +10,7 @@ def main():
         print(f"Invalid input. The value entered should be an integer.", file=sys.stderr)
         exit(1)
 
-    board = QueensBoard(n)
+    board = BitmaskQueensBoard(n)
 
     if solve_n_queens(board):
         board.draw()
@@ -38,6 +38,15 @@ class QueensBoard:
         """Returns the number of queens currently positioned on the _board"""
         return self._num_queens
 
+    def queens(self) -> list[tuple[int, int]]:
+        """Returns the (row, col) positions of the queens on the _board."""
+        return [
+            (row, col)
+            for row in range(self.size())
+            for col in range(self.size())
+            if self._board[row][col] == CellState.OCCUPIED
+        ]
+
     def unguarded(self, row: int, col: int) -> bool:
         """Return whether the given square is currently guarded."""
         self.check_coord_validity(row, col)
@@ -131,20 +140,28 @@ class QueensBoard:
         Prints the _board in a readable format using characters to represent
         the squares containing the queens and the empty squares.
         """
-        print(f"Occupied = {CellState.OCCUPIED.draw()}")
-        print(f"Empty = {CellState.UNOCCUPIED.draw()}")
-        print("\nBoard")
-        print("-----")
-        for row in self._board:
-            for cell in row:
-                print(f"{cell.draw()} ", end="")
+        _draw_board(self.size(), self.queens())
+
 
-            print()
+def _draw_board(n: int, queens: list[tuple[int, int]]):
+    """Prints an n x n board with queens at the given (row, col) positions."""
+    occupied = set(queens)
+
+    print(f"Occupied = {CellState.OCCUPIED.draw()}")
+    print(f"Empty = {CellState.UNOCCUPIED.draw()}")
+    print("\nBoard")
+    print("-----")
+    for row in range(n):
+        for col in range(n):
+            cell = CellState.OCCUPIED if (row, col) in occupied else CellState.UNOCCUPIED
+            print(f"{cell.draw()} ", end="")
 
         print()
 
+    print()
+
 
-def solve_n_queens(board: QueensBoard, col: int = 0) -> bool:
+def solve_n_queens(board: QueensBoard, col: int = 0, stats=None) -> bool:
     """
     This function uses backtracking to solve the n-queens problem for
     an n by n board. It returns after finding the first solution
@@ -153,6 +170,8 @@ def solve_n_queens(board: QueensBoard, col: int = 0) -> bool:
     :param col: The current column in which we are attempting to place a queen.
                 Default value is 0 as checking for the solution should start from
                 the first column.
+    :param stats: An optional SearchStats (see search_stats.py) that records
+                  every queen placed and removed.
     :return: A boolean value showing whether a solution was found or not.
     """
 
@@ -164,13 +183,111 @@ def solve_n_queens(board: QueensBoard, col: int = 0) -> bool:
         for row in range(board.size()):
             if board.unguarded(row, col):
                 board.place_queen(row, col)
+                if stats is not None:
+                    stats.node(col + 1, (row, col))
                 # Continue placing queens in the following columns
-                if solve_n_queens(board, col + 1):
+                if solve_n_queens(board, col + 1, stats):
                     return True  # We are done if a solution is found
                 else:
                     # No solution was found with the queen in this square,
                     # so it has to be removed from the _board
                     board.remove_queen(row, col)
+                    if stats is not None:
+                        stats.backtrack()
 
         # If the loop terminates, no queen can be placed within the current column
         return False
+
+
+class BitmaskQueensBoard:
+    """
+    A compact n-queens board with the same public interface as QueensBoard.
+
+    Instead of scanning an n x n grid of cells, the board keeps a count of the
+    queens on every row, column and diagonal, along with the set of occupied
+    squares. This lets unguarded, place_queen and remove_queen all run in
+    constant time, which matters once n grows past a couple of dozen.
+    """
+
+    def __init__(self, n: int = 4):
+        """Creates an n x n empty board."""
+        self._n = n
+        self._occupied: set[tuple[int, int]] = set()
+        self._rows = [0] * n
+        self._cols = [0] * n
+        # Squares on the same negatively sloping diagonal share row - col,
+        # those on the same positively sloping diagonal share row + col.
+        self._diagonals = [0] * (2 * n - 1)
+        self._anti_diagonals = [0] * (2 * n - 1)
+
+    def size(self):
+        """Returns the size of the board."""
+        return self._n
+
+    def check_coord_validity(self, row: int, col: int) -> None:
+        """:raises: ValueError if the row and col provided are not within the bounds of the grid."""
+        if (row >= self._n or col >= self._n) or (row < 0 or col < 0):
+            raise ValueError("Invalid coordinates")
+
+    def num_queens(self):
+        """Returns the number of queens currently positioned on the board"""
+        return len(self._occupied)
+
+    def queens(self) -> list[tuple[int, int]]:
+        """Returns the (row, col) positions of the queens on the board."""
+        return sorted(self._occupied)
+
+    def unguarded(self, row: int, col: int) -> bool:
+        """Return whether the given square is currently guarded."""
+        self.check_coord_validity(row, col)
+
+        return not (
+            self._rows[row]
+            or self._cols[col]
+            or self._diagonals[row - col + self._n - 1]
+            or self._anti_diagonals[row + col]
+        )
+
+    def place_queen(self, row: int, col: int):
+        """Places a queen on the board at position (row, col)"""
+        self.check_coord_validity(row, col)
+
+        if (row, col) in self._occupied:
+            raise Exception("Position is already occupied!")
+
+        self._occupied.add((row, col))
+        self._rows[row] += 1
+        self._cols[col] += 1
+        self._diagonals[row - col + self._n - 1] += 1
+        self._anti_diagonals[row + col] += 1
+
+    def remove_queen(self, row: int, col: int):
+        """Removes the queen from position (row, col)"""
+        self.check_coord_validity(row, col)
+
+        if (row, col) not in self._occupied:
+            raise Exception("Position is already unoccupied")
+
+        self._occupied.remove((row, col))
+        self._rows[row] -= 1
+        self._cols[col] -= 1
+        self._diagonals[row - col + self._n - 1] -= 1
+        self._anti_diagonals[row + col] -= 1
+
+    def reset(self):
+        """
+        Resets the board to its original state by removing all queens
+        currently placed on the board.
+        """
+
+        if self.num_queens() > 0:
+            self._occupied.clear()
+            for counts in (self._rows, self._cols, self._diagonals, self._anti_diagonals):
+                counts[:] = [0] * len(counts)
+
+    def draw(self):
+        """
+        Prints the board in a readable format using characters to represent
+        the squares containing the queens and the empty squares.
+        """
+        _draw_board(self._n, self.queens())
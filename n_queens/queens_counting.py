@@ -0,0 +1,192 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+class SubtreeResult:
+    """
+    The outcome of counting every solution whose queen in the first column
+    sits on a given row.
+    """
+
+    def __init__(self, first_row: int, weight: int, total: int, fixed_90: int, fixed_180: int,
+                 elapsed: float, worker: int):
+        self.first_row = first_row
+        # How many times this subtree counts towards the total (2 when its
+        # mirror image was skipped, 1 for the middle row of an odd board).
+        self.weight = weight
+        self.total = total
+        self.fixed_90 = fixed_90
+        self.fixed_180 = fixed_180
+        self.elapsed = elapsed
+        self.worker = worker
+
+
+class CountSummary:
+    """The results of counting all the solutions to the n-queens problem."""
+
+    def __init__(self, n: int, subtrees: list[SubtreeResult], elapsed: float):
+        self.n = n
+        self.subtrees = subtrees
+        self.elapsed = elapsed
+
+        self.total = sum(s.weight * s.total for s in subtrees)
+        fixed_90 = sum(s.weight * s.fixed_90 for s in subtrees)
+        fixed_180 = sum(s.weight * s.fixed_180 for s in subtrees)
+
+        # Burnside's lemma over the 8 symmetries of the square. For n > 1 no
+        # solution is fixed by a reflection, so only the rotations contribute.
+        if n == 1:
+            self.unique = 1
+        else:
+            self.unique = (self.total + 2 * fixed_90 + fixed_180) // 8
+
+    def worker_timings(self) -> dict[int, float]:
+        """Returns the total time spent by each worker process."""
+        timings: dict[int, float] = {}
+        for subtree in self.subtrees:
+            timings[subtree.worker] = timings.get(subtree.worker, 0.0) + subtree.elapsed
+        return timings
+
+    def __str__(self):
+        lines = [
+            f"n = {self.n}",
+            f"Total solutions = {self.total}",
+            f"Unique solutions = {self.unique}",
+            f"Elapsed = {self.elapsed:.3f}s",
+            "",
+            "First row | Weight | Solutions | Time",
+        ]
+        for s in self.subtrees:
+            lines.append(f"{s.first_row:>9} | {s.weight:>6} | {s.total:>9} | {s.elapsed:.3f}s")
+
+        lines.append("")
+        lines.append("Worker | Time")
+        for worker, elapsed in sorted(self.worker_timings().items()):
+            lines.append(f"{worker:>6} | {elapsed:.3f}s")
+
+        return "\n".join(lines)
+
+
+def _fixed_by_rotation_180(queens: list[int], n: int) -> bool:
+    for col in range(n):
+        if queens[n - 1 - col] != n - 1 - queens[col]:
+            return False
+    return True
+
+
+def _fixed_by_rotation_90(queens: list[int], n: int) -> bool:
+    for col in range(n):
+        if queens[n - 1 - queens[col]] != col:
+            return False
+    return True
+
+
+def count_subtree(n: int, first_row: int, weight: int = 1, stats=None) -> SubtreeResult:
+    """
+    Counts the solutions with the first column's queen on first_row, along
+    with how many of them are unchanged by a 90 and a 180 degree rotation.
+
+    Rows, columns and diagonals are tracked as bitmasks, one bit per row of
+    the column currently being filled.
+
+    :param stats: An optional SearchStats (see search_stats.py) that records
+                  every queen placed after the first.
+    """
+    start = time.perf_counter()
+    full = (1 << n) - 1
+    queens = [0] * n
+    queens[0] = first_row
+    counts = [0, 0, 0]  # total, fixed by 90 degrees, fixed by 180 degrees
+
+    def place(col: int, rows: int, diagonals: int, anti_diagonals: int):
+        if col == n:
+            counts[0] += 1
+            # Any solution fixed by a quarter turn is also fixed by a half turn
+            if _fixed_by_rotation_180(queens, n):
+                counts[2] += 1
+                if _fixed_by_rotation_90(queens, n):
+                    counts[1] += 1
+            return
+
+        available = full & ~(rows | diagonals | anti_diagonals)
+        while available:
+            bit = available & -available
+            available ^= bit
+            queens[col] = bit.bit_length() - 1
+            if stats is not None:
+                stats.node(col + 1, (queens[col], col))
+            place(col + 1, rows | bit, ((diagonals | bit) << 1) & full, (anti_diagonals | bit) >> 1)
+
+    bit = 1 << first_row
+    place(1, bit, (bit << 1) & full, bit >> 1)
+
+    return SubtreeResult(first_row, weight, counts[0], counts[1], counts[2],
+                         time.perf_counter() - start, os.getpid())
+
+
+def _count_subtree_task(args: tuple[int, int, int]) -> SubtreeResult:
+    return count_subtree(*args)
+
+
+def _subtree_tasks(n: int) -> list[tuple[int, int, int]]:
+    """
+    Reflecting a board top to bottom maps the solutions starting on row r to
+    those starting on row n - 1 - r, so only the top half of the first column
+    is searched and each of those subtrees is counted twice.
+    """
+    if n < 1:
+        raise ValueError("The size of the board should be at least 1")
+
+    tasks = [(n, row, 2) for row in range(n // 2)]
+    if n % 2 == 1:
+        tasks.append((n, n // 2, 1))
+    return tasks
+
+
+def count_n_queens(n: int, workers: int | None = None) -> CountSummary:
+    """
+    Counts every solution to the n-queens problem, splitting the search across
+    a process pool by the row of the queen in the first column. Only the top
+    half of the first column is searched, since the bottom half mirrors it.
+
+    :param n: The size of the board.
+    :param workers: The number of worker processes. Defaults to the number of CPUs.
+    :return: A summary with the total and unique counts and per-worker timings.
+    """
+    tasks = _subtree_tasks(n)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        subtrees = list(executor.map(_count_subtree_task, tasks))
+
+    return CountSummary(n, subtrees, time.perf_counter() - start)
+
+
+def count_n_queens_serial(n: int, stats=None) -> CountSummary:
+    """
+    Counts every solution like count_n_queens, but in this process, for
+    callers that already spread their work over processes of their own.
+
+    :param stats: An optional SearchStats (see search_stats.py) that records
+                  every queen placed after the first.
+    """
+    tasks = _subtree_tasks(n)
+
+    start = time.perf_counter()
+    subtrees = [count_subtree(*task, stats=stats) for task in tasks]
+    return CountSummary(n, subtrees, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count all the solutions to the n-queens problem.")
+    parser.add_argument("n", type=int, help="The size of the board")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    args = parser.parse_args()
+
+    print(count_n_queens(args.n, args.workers))
+
+
+if __name__ == '__main__':
+    main()
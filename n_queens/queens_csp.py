@@ -0,0 +1,241 @@
+import argparse
+import random
+import time
+from array import array
+
+from queens_board import BitmaskQueensBoard
+
+
+class QueensSolution:
+    """
+    A placement of n queens with exactly one queen per column, stored as an
+    array of row indices where rows[col] is the row of the queen in column col.
+    """
+
+    def __init__(self, rows: array):
+        self.rows = rows
+
+    def size(self):
+        """Returns the size of the board."""
+        return len(self.rows)
+
+    def is_valid(self) -> bool:
+        """Checks that no two queens attack each other."""
+        n = self.size()
+        seen_rows = set()
+        seen_diagonals = set()
+        seen_anti_diagonals = set()
+
+        for col, row in enumerate(self.rows):
+            if row in seen_rows or row - col in seen_diagonals or row + col in seen_anti_diagonals:
+                return False
+            seen_rows.add(row)
+            seen_diagonals.add(row - col)
+            seen_anti_diagonals.add(row + col)
+
+        return len(seen_rows) == n
+
+    def to_board(self) -> BitmaskQueensBoard:
+        """Places the queens on a board so that it can be drawn."""
+        board = BitmaskQueensBoard(self.size())
+        for col, row in enumerate(self.rows):
+            board.place_queen(row, col)
+        return board
+
+    def draw(self):
+        """Draws the solution. Only sensible for small boards."""
+        self.to_board().draw()
+
+    def export(self, path: str):
+        """
+        Writes the row indices to a file as raw machine integers, which for
+        large n is far more compact than any textual format.
+        """
+        with open(path, "wb") as f:
+            self.rows.tofile(f)
+
+    @staticmethod
+    def load(path: str, typecode: str = "l") -> "QueensSolution":
+        """Reads a solution previously written by export."""
+        rows = array(typecode)
+        with open(path, "rb") as f:
+            rows.frombytes(f.read())
+        return QueensSolution(rows)
+
+
+def solve_min_conflicts(n: int, seed: int | None = None, max_restarts: int = 50,
+                        max_passes: int = 1000, stats=None) -> QueensSolution:
+    """
+    Solves the n-queens problem as a CSP using min-conflicts local search.
+
+    The queens are kept as a permutation (one queen per column, one per row),
+    so the row constraints always hold and only the diagonal constraints have
+    to be repaired. The number of queens on every diagonal is tracked in a
+    pair of counter arrays, so the change in conflicts caused by swapping the
+    rows of two columns is computed in constant time.
+
+    :param n: The size of the board.
+    :param seed: Seed for the random number generator, for reproducible runs.
+    :param max_restarts: How many fresh starting positions to try before giving up.
+    :param max_passes: The number of repair passes allowed per starting position.
+    :param stats: An optional SearchStats (see search_stats.py) that records
+                  every conflicted column repaired, at the depth of its
+                  pass, and every restart as a backtrack.
+    :return: The solution found.
+    :raises: ValueError if the board has no solution, RuntimeError if none was found.
+    """
+    if n < 1 or n in (2, 3):
+        raise ValueError(f"There is no solution where n = {n}")
+
+    rng = random.Random(seed)
+
+    for restart in range(max_restarts):
+        if restart and stats is not None:
+            stats.backtrack()
+        rows, diagonals, anti_diagonals = _greedy_start(n, rng)
+        conflicted = _conflicted_columns(n, rows, diagonals, anti_diagonals, range(n))
+
+        stuck_passes = 0
+        for passes in range(max_passes):
+            if not conflicted:
+                return QueensSolution(rows)
+
+            # Spend about n swap attempts per pass however few columns are left
+            attempts = max(8, n // len(conflicted))
+            moved = []
+            for i in conflicted:
+                if stats is not None:
+                    stats.node(passes + 1, i)
+                j = _swap_with_random_column(n, i, rows, diagonals, anti_diagonals, rng, attempts)
+                if j >= 0:
+                    moved.append(j)
+
+            # A column can only become conflicted when a queen moves onto one
+            # of its diagonals, and the moved queen is then conflicted too, so
+            # only the columns touched by this pass need checking again.
+            candidates = set(conflicted)
+            candidates.update(moved)
+            conflicted = _conflicted_columns(n, rows, diagonals, anti_diagonals, sorted(candidates))
+
+            stuck_passes = 0 if moved else stuck_passes + 1
+            if stuck_passes >= 10:
+                # Stuck in a local minimum, so start again from a new position
+                break
+
+    raise RuntimeError(f"Could not find a solution where n = {n}")
+
+
+def _conflicted_columns(n: int, rows: array, diagonals: array, anti_diagonals: array, columns) -> list[int]:
+    """Returns the columns whose queen shares a diagonal with another queen."""
+    offset = n - 1
+    return [
+        col for col in columns
+        if diagonals[rows[col] - col + offset] > 1 or anti_diagonals[rows[col] + col] > 1
+    ]
+
+
+def _greedy_start(n: int, rng: random.Random, attempts: int = 100) -> tuple[array, array, array]:
+    """
+    Builds a starting permutation column by column, trying random free rows
+    for each column and keeping the first that is not on an occupied
+    diagonal. All but a handful of columns end up conflict free, leaving
+    little to repair.
+    """
+    rows = array("l", [0]) * n
+    diagonals = array("l", [0]) * (2 * n - 1)
+    anti_diagonals = array("l", [0]) * (2 * n - 1)
+
+    free = list(range(n))
+    remaining = n
+    offset = n - 1
+    rand = rng.random
+
+    for col in range(n):
+        for _ in range(attempts):
+            index = int(rand() * remaining)
+            row = free[index]
+            if not diagonals[row - col + offset] and not anti_diagonals[row + col]:
+                break
+
+        remaining -= 1
+        free[index] = free[remaining]
+
+        rows[col] = row
+        diagonals[row - col + offset] += 1
+        anti_diagonals[row + col] += 1
+
+    return rows, diagonals, anti_diagonals
+
+
+def _swap_with_random_column(n: int, i: int, rows: array, diagonals: array, anti_diagonals: array,
+                             rng: random.Random, attempts: int = 8) -> int:
+    """
+    Tries swapping the rows of column i with those of random columns, keeping
+    the first swap that reduces the number of conflicts.
+
+    :return: The column swapped with, or -1 if no swap was made.
+    """
+    row_i = rows[i]
+    if diagonals[row_i - i + n - 1] <= 1 and anti_diagonals[row_i + i] <= 1:
+        # An earlier swap in this pass already resolved this column
+        return -1
+
+    for _ in range(attempts):
+        j = rng.randrange(n)
+        if j == i:
+            continue
+        row_j = rows[j]
+
+        before = (diagonals[row_i - i + n - 1] + anti_diagonals[row_i + i]
+                  + diagonals[row_j - j + n - 1] + anti_diagonals[row_j + j])
+
+        diagonals[row_i - i + n - 1] -= 1
+        anti_diagonals[row_i + i] -= 1
+        diagonals[row_j - j + n - 1] -= 1
+        anti_diagonals[row_j + j] -= 1
+        diagonals[row_j - i + n - 1] += 1
+        anti_diagonals[row_j + i] += 1
+        diagonals[row_i - j + n - 1] += 1
+        anti_diagonals[row_i + j] += 1
+
+        after = (diagonals[row_j - i + n - 1] + anti_diagonals[row_j + i]
+                 + diagonals[row_i - j + n - 1] + anti_diagonals[row_i + j])
+
+        if after < before:
+            rows[i] = row_j
+            rows[j] = row_i
+            return j
+
+        # Undo the swap
+        diagonals[row_j - i + n - 1] -= 1
+        anti_diagonals[row_j + i] -= 1
+        diagonals[row_i - j + n - 1] -= 1
+        anti_diagonals[row_i + j] -= 1
+        diagonals[row_i - i + n - 1] += 1
+        anti_diagonals[row_i + i] += 1
+        diagonals[row_j - j + n - 1] += 1
+        anti_diagonals[row_j + j] += 1
+
+    return -1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve the n-queens problem using min-conflicts.")
+    parser.add_argument("n", type=int, help="The size of the board")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the random number generator")
+    parser.add_argument("--export", default=None, help="File to write the row of each queen to")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    solution = solve_min_conflicts(args.n, seed=args.seed)
+    print(f"Found a solution where n = {args.n} in {time.perf_counter() - start:.3f}s")
+
+    if args.export:
+        solution.export(args.export)
+        print(f"Solution written to {args.export}")
+    elif args.n <= 50:
+        solution.draw()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+import argparse
+import sys
+from typing import Iterator, TextIO
+
+
+def iter_solutions(n: int, placed: dict[int, int] | None = None) -> Iterator[tuple[int, ...]]:
+    """
+    Lazily generates every solution to the n-queens problem without recursion.
+
+    Each solution is a tuple where the value at index col is the row of the
+    queen in column col. The search keeps an explicit stack holding, for each
+    column still to be filled, a bitmask of the rows not yet tried there, so
+    the board size is not limited by Python's recursion limit.
+
+    :param n: The size of the board.
+    :param placed: Queens that are already on the board, as a mapping of
+                   column to row. Only completions of this partial placement
+                   are generated (the n-queens completion problem).
+    :return: An iterator over the solutions.
+    :raises: ValueError if the placed queens are off the board or attack each other.
+    """
+    full = (1 << n) - 1
+    # Row bit r, diagonal bit row - col + n - 1 and anti-diagonal bit row + col
+    rows_mask = diagonals = anti_diagonals = 0
+    solution = [-1] * n
+
+    for col, row in (placed or {}).items():
+        if not (0 <= row < n and 0 <= col < n):
+            raise ValueError("Invalid coordinates")
+
+        row_bit, diagonal_bit, anti_diagonal_bit = 1 << row, 1 << (row - col + n - 1), 1 << (row + col)
+        if rows_mask & row_bit or diagonals & diagonal_bit or anti_diagonals & anti_diagonal_bit:
+            raise ValueError(f"The queen at ({row}, {col}) is attacked by another queen")
+
+        rows_mask |= row_bit
+        diagonals |= diagonal_bit
+        anti_diagonals |= anti_diagonal_bit
+        solution[col] = row
+
+    free_cols = [col for col in range(n) if solution[col] < 0]
+    if not free_cols:
+        yield tuple(solution)
+        return
+
+    last = len(free_cols) - 1
+    untried = [0] * len(free_cols)
+
+    col = free_cols[0]
+    untried[0] = full & ~(rows_mask | (diagonals >> (n - 1 - col)) | (anti_diagonals >> col))
+    depth = 0
+
+    while depth >= 0:
+        col = free_cols[depth]
+
+        # Take back the queen previously placed in this column, if any
+        row = solution[col]
+        if row >= 0:
+            rows_mask ^= 1 << row
+            diagonals ^= 1 << (row - col + n - 1)
+            anti_diagonals ^= 1 << (row + col)
+            solution[col] = -1
+
+        available = untried[depth]
+        if not available:
+            depth -= 1
+            continue
+
+        bit = available & -available
+        untried[depth] = available ^ bit
+        row = bit.bit_length() - 1
+
+        rows_mask |= bit
+        diagonals |= 1 << (row - col + n - 1)
+        anti_diagonals |= 1 << (row + col)
+        solution[col] = row
+
+        if depth == last:
+            yield tuple(solution)
+        else:
+            depth += 1
+            col = free_cols[depth]
+            untried[depth] = full & ~(rows_mask | (diagonals >> (n - 1 - col)) | (anti_diagonals >> col))
+
+
+def placed_queens(board) -> dict[int, int]:
+    """
+    Returns the queens on a QueensBoard or BitmaskQueensBoard as a mapping of
+    column to row, as expected by iter_solutions.
+
+    :raises: ValueError if a column holds more than one queen.
+    """
+    placed: dict[int, int] = {}
+    for row, col in board.queens():
+        if col in placed:
+            raise ValueError(f"Column {col} holds more than one queen")
+        placed[col] = row
+    return placed
+
+
+def solve_n_queens_iterative(board) -> bool:
+    """
+    Completes the queens already on the board into a solution, placing the
+    missing queens on the board. Unlike solve_n_queens it does not recurse.
+
+    :param board: The board in which the queens are placed.
+    :return: A boolean value showing whether a solution was found or not.
+    """
+    try:
+        placed = placed_queens(board)
+        solution = next(iter_solutions(board.size(), placed), None)
+    except ValueError:
+        return False
+
+    if solution is None:
+        return False
+
+    for col, row in enumerate(solution):
+        if col not in placed:
+            board.place_queen(row, col)
+
+    return True
+
+
+def write_solutions(n: int, out: TextIO, placed: dict[int, int] | None = None, limit: int | None = None) -> int:
+    """
+    Streams solutions to a file, one per line as comma separated rows.
+
+    :return: The number of solutions written.
+    """
+    count = 0
+    for solution in iter_solutions(n, placed):
+        if limit is not None and count >= limit:
+            break
+        out.write(",".join(map(str, solution)))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream the solutions to the n-queens problem.")
+    parser.add_argument("n", type=int, help="The size of the board")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many solutions")
+    parser.add_argument("--place", action="append", default=[], metavar="ROW,COL",
+                        help="A queen that is already on the board (may be repeated)")
+    args = parser.parse_args()
+
+    placed = {}
+    for position in args.place:
+        row, col = map(int, position.split(","))
+        placed[col] = row
+
+    count = write_solutions(args.n, sys.stdout, placed, args.limit)
+    print(f"{count} solution(s)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Each project imports its own modules by bare name, so its directory has to
+# be on sys.path to use it from elsewhere. The module names are unique
+# across the projects, so they can all be on the path at once.
+PROJECT_DIRS = {
+    "n_queens": os.path.join(ROOT, "n_queens"),
+    "jug_puzzle": os.path.join(ROOT, "jug_puzzle"),
+    "sudoku": os.path.join(ROOT, "sudoku"),
+    "tic_tac_toe": os.path.join(ROOT, "tic-tac-toe", "expectimax"),
+}
+
+
+def add_project_paths(*projects: str):
+    """
+    Puts the directories of the given projects, or of all of them if none
+    are given, on sys.path so that their modules can be imported.
+
+    :raises: KeyError if a project is not one of PROJECT_DIRS.
+    """
+    for project in projects or PROJECT_DIRS:
+        path = PROJECT_DIRS[project]
+        if path not in sys.path:
+            sys.path.insert(0, path)
@@ -0,0 +1,401 @@
+import heapq
+from array import array
+from collections import deque
+from itertools import count
+from typing import Any, Callable, Hashable, Iterable, Iterator, Literal
+
+State = Any
+Path = list[State]
+
+
+class SearchProblem:
+    """
+    A state space to search: where to start, the states each state leads
+    to, and which states are goals.
+
+    The searches below only ever go through these, so a puzzle plugs into
+    all of them by describing itself once.
+    """
+
+    def __init__(
+        self,
+        initial: State,
+        successors: Callable[[State], Iterable[State]],
+        is_goal: Callable[[State], bool],
+        heuristic: Callable[[State], float] | None = None,
+        key: Callable[[State], Hashable] | None = None,
+        cost: Callable[[State, State], float] | None = None,
+    ):
+        """
+        :param initial: The state the search starts from.
+        :param successors: Returns the states one move away from a state,
+                           in the order they should be tried.
+        :param is_goal: Tells whether a state is a goal.
+        :param heuristic: An estimate of the cost left from a state to the
+                          nearest goal, needed by A* and best-first search.
+                          A* only finds the cheapest path if it never
+                          overestimates.
+        :param key: Returns a hashable value identifying a state, for states
+                    that are not hashable or hold details that do not tell
+                    states apart. By default a state is its own key.
+        :param cost: The cost of moving from one state to the next, one by
+                     default. Only A* takes costs into account.
+        """
+        self.initial = initial
+        self.successors = successors
+        self.is_goal = is_goal
+        self.heuristic = heuristic
+        self.key = key if key is not None else _identity
+        self.cost = cost
+
+
+def _identity(state: State) -> State:
+    return state
+
+
+class SearchTree:
+    """
+    The nodes a search has generated. Each node is an integer id, and its
+    state, parent id and depth are stored by id in a list and two flat
+    arrays, rather than in a chain of node objects.
+
+    intern() also remembers the key of every state added through it, so a
+    graph search keeps one node per state. The depth-first searches that
+    may reach a state along many paths keep only the path they are on
+    instead of a tree.
+    """
+
+    def __init__(self, key: Callable[[State], Hashable] = _identity):
+        self.key = key
+        self.ids: dict[Hashable, int] = {}
+        self.states: list[State] = []
+        self.parents = array("i")
+        self.depths = array("i")
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def add(self, state: State, parent: int = -1) -> int:
+        """
+        Adds a node for the state below the given parent, or as a root if
+        the parent is -1, and returns its id.
+        """
+        self.states.append(state)
+        self.parents.append(parent)
+        self.depths.append(0 if parent < 0 else self.depths[parent] + 1)
+        return len(self.states) - 1
+
+    def intern(self, state: State, parent: int = -1) -> int:
+        """
+        Adds a node for the state like add(), unless a node with the same
+        key was interned before.
+
+        :return: The id of the new node, or -1 if the state was seen before.
+        """
+        key = self.key(state)
+        if key in self.ids:
+            return -1
+        node = self.add(state, parent)
+        self.ids[key] = node
+        return node
+
+    def find(self, state: State) -> int:
+        """Returns the id of the interned node for the state, or -1."""
+        return self.ids.get(self.key(state), -1)
+
+    def reparent(self, node: int, parent: int):
+        """Moves a node below a new parent, once a better path to it is found."""
+        self.parents[node] = parent
+        self.depths[node] = self.depths[parent] + 1
+
+    def path(self, node: int) -> Path:
+        """Returns the states from the root down to the node."""
+        path = []
+        while node >= 0:
+            path.append(self.states[node])
+            node = self.parents[node]
+        path.reverse()
+        return path
+
+
+def breadth_first_search(problem: SearchProblem, stats=None) -> Path | Literal[False]:
+    """
+    Finds a path to a goal with the fewest moves. States are tested as they
+    are generated, so the search stops a whole level earlier than it would
+    testing them as they are expanded.
+
+    :param stats: An optional SearchStats (see search_stats.py) that
+                  records the states expanded and the queue size.
+    """
+    tree = SearchTree(problem.key)
+    root = tree.intern(problem.initial)
+    if problem.is_goal(problem.initial):
+        return tree.path(root)
+
+    queue: deque[int] = deque([root])
+    while queue:
+        current = queue.popleft()
+        if stats is not None:
+            stats.node(tree.depths[current], tree.states[current])
+
+        for state in problem.successors(tree.states[current]):
+            node = tree.intern(state, current)
+            if node < 0:
+                continue
+            if problem.is_goal(state):
+                return tree.path(node)
+            queue.append(node)
+
+        if stats is not None:
+            stats.frontier(len(queue))
+
+    return False
+
+
+def depth_first_search(problem: SearchProblem, max_depth: int | None = None, stats=None) -> Path | Literal[False]:
+    """
+    Finds a path to a goal by following the first successor of every state
+    as deep as it goes, never revisiting a state. The path found need not
+    be the shortest.
+
+    With a depth limit, a state first reached along a path too long to
+    search past may be within reach along a shorter one, so a state
+    reached again at a smaller depth than before is searched again.
+
+    :param max_depth: Do not look further than this many moves from the
+                      start, or no limit if None.
+    :param stats: An optional SearchStats (see search_stats.py) that
+                  records the states expanded and the stack size.
+
+    >>> graph = {"S": ["A", "X"], "A": ["A2"], "A2": ["B"], "X": ["B"], "B": ["G"], "G": []}
+    >>> problem = SearchProblem("S", graph.__getitem__, lambda state: state == "G")
+    >>> depth_first_search(problem, max_depth=3)
+    ['S', 'X', 'B', 'G']
+    """
+    tree = SearchTree(problem.key)
+    stack = [tree.intern(problem.initial)]
+    # The smallest depth each state was reached at, for the states reached
+    # more than once under a depth limit
+    shallowest: dict[Hashable, int] = {}
+
+    while stack:
+        current = stack.pop()
+        state = tree.states[current]
+        if problem.is_goal(state):
+            return tree.path(current)
+        if max_depth is not None and tree.depths[current] >= max_depth:
+            continue
+
+        if stats is not None:
+            stats.node(tree.depths[current], state)
+        # Pushed in reverse so the first successor is expanded first
+        for child in reversed(list(problem.successors(state))):
+            node = tree.intern(child, current)
+            if node < 0:
+                if max_depth is None:
+                    continue
+                key = problem.key(child)
+                depth = tree.depths[current] + 1
+                if shallowest.get(key, tree.depths[tree.find(child)]) <= depth:
+                    continue
+                shallowest[key] = depth
+                node = tree.add(child, current)
+            stack.append(node)
+
+        if stats is not None:
+            stats.frontier(len(stack))
+
+    return False
+
+
+def depth_limited_search(problem: SearchProblem, max_depth: int, stats=None) -> Iterator[Path]:
+    """
+    Yields a path for every way of reaching a goal within max_depth moves,
+    without stopping at goals to look beyond them. States are not
+    remembered, so the same state is searched again along every path that
+    reaches it. The successors of a state are searched last to first.
+
+    Only the current path and the successors still to try along it are
+    kept, so the memory used grows with the depth rather than the number
+    of paths searched.
+
+    :param stats: An optional SearchStats (see search_stats.py) that
+                  records the states expanded and the number waiting.
+    """
+    # The states along the current path, and the successors of each still
+    # to try, so that waiting[depth] holds the states at that depth
+    path: Path = []
+    waiting = [[problem.initial]]
+    size = 1
+
+    while waiting:
+        if not waiting[-1]:
+            # Every successor of the last state on the path has been tried
+            waiting.pop()
+            if path:
+                path.pop()
+            continue
+
+        state = waiting[-1].pop()
+        size -= 1
+        depth = len(path)
+        if problem.is_goal(state):
+            yield path + [state]
+            continue
+        if depth >= max_depth:
+            continue
+
+        if stats is not None:
+            stats.node(depth, state)
+        path.append(state)
+        waiting.append(list(problem.successors(state)))
+        size += len(waiting[-1])
+        if stats is not None:
+            stats.frontier(size)
+
+
+def iterative_deepening_search(problem: SearchProblem, max_depth: int, stats=None) -> Iterator[Path]:
+    """
+    Yields a path to each distinct goal state reachable within max_depth
+    moves, shallowest first, using depth-limited searches with a growing
+    limit. The first path yielded is the shortest.
+
+    Each round remembers the shallowest depth at which every state was
+    reached, and skips any state reached again at an equal or greater
+    depth. The rounds stop early once one finishes without reaching the
+    limit, since going deeper would find nothing new. Like
+    depth_limited_search, a round only keeps the current path and the
+    successors waiting along it.
+
+    :param stats: An optional SearchStats (see search_stats.py) that
+                  records the states expanded, the number waiting, and
+                  each state cut off at the depth limit as a backtrack.
+    """
+    found = set()
+
+    for limit in range(max_depth + 1):
+        shallowest = {problem.key(problem.initial): 0}
+        path: Path = []
+        waiting = [[problem.initial]]
+        size = 1
+        cut_off = False
+
+        while waiting:
+            if not waiting[-1]:
+                waiting.pop()
+                if path:
+                    path.pop()
+                continue
+
+            state = waiting[-1].pop()
+            size -= 1
+            depth = len(path)
+
+            if problem.is_goal(state):
+                # Goals shallower than the limit were yielded in an earlier round
+                key = problem.key(state)
+                if depth == limit and key not in found:
+                    found.add(key)
+                    yield path + [state]
+                continue
+
+            if depth >= limit:
+                cut_off = True
+                if stats is not None:
+                    stats.backtrack()
+                continue
+
+            if stats is not None:
+                stats.node(depth, state)
+            children = []
+            for child in problem.successors(state):
+                key = problem.key(child)
+                if shallowest.get(key, depth + 2) <= depth + 1:
+                    continue
+                shallowest[key] = depth + 1
+                children.append(child)
+            path.append(state)
+            waiting.append(children)
+            size += len(children)
+
+            if stats is not None:
+                stats.frontier(size)
+
+        if not cut_off:
+            return
+
+
+def _priority_search(problem: SearchProblem, use_cost: bool, stats) -> Path | Literal[False]:
+    if problem.heuristic is None:
+        raise ValueError("The problem needs a heuristic for this search")
+    heuristic = problem.heuristic
+    step_cost = problem.cost
+
+    tree = SearchTree(problem.key)
+    root = tree.intern(problem.initial)
+    # The cost of the best path found to each node so far, by id
+    costs = array("d", [0.0])
+    closed = bytearray(1)
+    # The counter breaks ties in insertion order without comparing states
+    tie_breaker = count()
+    queue = [(heuristic(problem.initial), next(tie_breaker), root)]
+
+    while queue:
+        _, _, current = heapq.heappop(queue)
+        if closed[current]:
+            continue
+        closed[current] = 1
+
+        state = tree.states[current]
+        if problem.is_goal(state):
+            return tree.path(current)
+        if stats is not None:
+            stats.node(tree.depths[current], state)
+
+        for child in problem.successors(state):
+            cost = costs[current] + (step_cost(state, child) if step_cost is not None else 1)
+            node = tree.intern(child, current)
+            if node >= 0:
+                costs.append(cost)
+                closed.append(0)
+            else:
+                node = tree.find(child)
+                # Reopened if a cheaper path turns up, which an inconsistent heuristic allows
+                if not use_cost or cost >= costs[node]:
+                    continue
+                tree.reparent(node, current)
+                costs[node] = cost
+                closed[node] = 0
+
+            priority = cost + heuristic(child) if use_cost else heuristic(child)
+            heapq.heappush(queue, (priority, next(tie_breaker), node))
+
+        if stats is not None:
+            stats.frontier(len(queue))
+
+    return False
+
+
+def a_star_search(problem: SearchProblem, stats=None) -> Path | Literal[False]:
+    """
+    Finds the cheapest path to a goal, expanding states in order of the cost
+    so far plus the heuristic's estimate of the cost left.
+
+    :param stats: An optional SearchStats (see search_stats.py) that
+                  records the states expanded and the queue size.
+    :raises: ValueError if the problem has no heuristic.
+    """
+    return _priority_search(problem, True, stats)
+
+
+def best_first_search(problem: SearchProblem, stats=None) -> Path | Literal[False]:
+    """
+    Finds a path to a goal, always expanding the state the heuristic rates
+    closest to one. This is often much faster than A*, but the path found
+    need not be the shortest.
+
+    :param stats: An optional SearchStats (see search_stats.py) that
+                  records the states expanded and the queue size.
+    :raises: ValueError if the problem has no heuristic.
+    """
+    return _priority_search(problem, False, stats)
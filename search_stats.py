@@ -0,0 +1,89 @@
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, TextIO
+
+NodeCallback = Callable[[int, Any], None]
+
+
+class SearchStats:
+    """
+    Counters that a search fills in as it runs.
+
+    The solvers take an optional stats argument and only touch it when one is
+    given, so they never import this module and pay nothing when it is left
+    out. Any object with the same methods can be passed in its place.
+    """
+
+    def __init__(self, on_node: NodeCallback | None = None):
+        """
+        :param on_node: Called with the depth and the state of every node
+                        expanded, for tracing a search.
+        """
+        self.nodes = 0
+        self.backtracks = 0
+        self.max_depth = 0
+        self.frontier_peak = 0
+        self.propagations = 0
+        self.phases: dict[str, float] = {}
+        self.on_node = on_node
+
+    def node(self, depth: int, state: Any = None):
+        """Records a node being expanded at the given depth."""
+        self.nodes += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if self.on_node is not None:
+            self.on_node(depth, state)
+
+    def backtrack(self):
+        """Records a choice being undone."""
+        self.backtracks += 1
+
+    def frontier(self, size: int):
+        """Records the current size of the queue or stack of nodes waiting to be expanded."""
+        if size > self.frontier_peak:
+            self.frontier_peak = size
+
+    def propagated(self, count: int = 1):
+        """Records values ruled out by propagation rather than search."""
+        self.propagations += count
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Adds the time spent in the with block to the named phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "nodes": self.nodes,
+            "backtracks": self.backtracks,
+            "max_depth": self.max_depth,
+            "frontier_peak": self.frontier_peak,
+            "propagations": self.propagations,
+            "phases": dict(self.phases),
+        }
+
+    def __str__(self):
+        phases = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in self.phases.items())
+        return (
+            f"{self.nodes} nodes, {self.backtracks} backtracks, max depth {self.max_depth}, "
+            f"frontier peak {self.frontier_peak}, {self.propagations} propagations"
+            + (f" ({phases})" if phases else "")
+        )
+
+
+def tracer(out: TextIO = sys.stderr, max_depth: int | None = None) -> NodeCallback:
+    """
+    Returns a node callback that prints every node, indented by its depth.
+    Nodes deeper than max_depth are left out.
+    """
+    def on_node(depth: int, state: Any):
+        if max_depth is None or depth <= max_depth:
+            print(f"{'  ' * depth}{state!r}", file=out)
+
+    return on_node
@@ -0,0 +1,234 @@
+from math import isqrt
+from typing import Iterator
+
+
+class ExactCover:
+    """
+    Knuth's Algorithm X using Dancing Links, with the links of the nodes kept
+    in flat integer lists rather than node objects.
+
+    Node 0 is the root, nodes 1 to num_columns are the column headers and the
+    rest belong to the rows that were added. For every node, left, right, up
+    and down hold the neighbouring node indices and column the header index.
+    """
+
+    def __init__(self, num_columns: int):
+        self.num_columns = num_columns
+        headers = range(num_columns + 1)
+
+        self.left = [i - 1 for i in headers]
+        self.left[0] = num_columns
+        self.right = [i + 1 for i in headers]
+        self.right[num_columns] = 0
+        self.up = list(headers)
+        self.down = list(headers)
+        self.column = list(headers)
+        self.size = [0] * (num_columns + 1)
+        # The row each node belongs to, -1 for the root and headers
+        self.row = [-1] * (num_columns + 1)
+
+    def add_row(self, row: int, columns: list[int]):
+        """
+        Adds a row covering the given columns, numbered from 1.
+
+        :param row: An identifier reported back in the solutions.
+        """
+        first = None
+        for col in columns:
+            node = len(self.column)
+            self.column.append(col)
+            self.row.append(row)
+
+            # Insert at the bottom of the column
+            self.up.append(self.up[col])
+            self.down.append(col)
+            self.down[self.up[col]] = node
+            self.up[col] = node
+            self.size[col] += 1
+
+            if first is None:
+                first = node
+                self.left.append(node)
+                self.right.append(node)
+            else:
+                self.left.append(self.left[first])
+                self.right.append(first)
+                self.right[self.left[first]] = node
+                self.left[first] = node
+
+    def _cover(self, col: int):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+
+        right[left[col]] = right[col]
+        left[right[col]] = left[col]
+        i = down[col]
+        while i != col:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def _uncover(self, col: int):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+
+        i = up[col]
+        while i != col:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[col]] = col
+        left[right[col]] = col
+
+    def solutions(self, stats=None) -> Iterator[list[int]]:
+        """
+        Generates every exact cover as a list of row identifiers. The search
+        keeps its own stack of chosen nodes, so deep searches do not run into
+        Python's recursion limit.
+
+        An optional SearchStats (see search_stats.py) records every row
+        chosen and undone.
+        """
+        right, down, column, size = self.right, self.down, self.column, self.size
+
+        chosen: list[int] = []
+        while True:
+            if right[0] == 0:
+                yield [self.row[node] for node in chosen]
+                node = None
+            else:
+                # Branch on the column with the fewest rows left
+                col = right[0]
+                best = col
+                while col != 0:
+                    if size[col] < size[best]:
+                        best = col
+                        if size[col] <= 1:
+                            break
+                    col = right[col]
+                self._cover(best)
+                node = down[best]
+
+            while True:
+                if node is None:
+                    # Backtrack, undoing the last choice and moving to the next row
+                    if not chosen:
+                        return
+                    node = chosen.pop()
+                    if stats is not None:
+                        stats.backtrack()
+                    j = self.left[node]
+                    while j != node:
+                        self._uncover(column[j])
+                        j = self.left[j]
+                    node = down[node]
+
+                col = column[node]
+                if node == col:
+                    # Every row of this column has been tried
+                    self._uncover(col)
+                    node = None
+                    continue
+
+                chosen.append(node)
+                if stats is not None:
+                    stats.node(len(chosen), self.row[node])
+                j = right[node]
+                while j != node:
+                    self._cover(column[j])
+                    j = right[j]
+                break
+
+    def count(self, limit: int | None = None) -> int:
+        """Counts the exact covers, stopping early once limit is reached."""
+        total = 0
+        for _ in self.solutions():
+            total += 1
+            if limit is not None and total >= limit:
+                break
+        return total
+
+
+def sudoku_exact_cover(grid, box_size: int | None = None) -> ExactCover:
+    """
+    Builds the exact cover problem for an N x N Sudoku grid, where N is the
+    square of box_size. Each row places one digit in one cell and is
+    identified by cell * N + digit - 1. The columns require every cell to
+    hold one digit and every digit to appear once in each row, column and box.
+
+    Rows that clash with a digit already in the grid are left out.
+    """
+    box_size = box_size or isqrt(len(grid))
+    n = box_size * box_size
+    if len(grid) != n or any(len(row) != n for row in grid):
+        raise ValueError(f"Expected a {n} x {n} grid")
+
+    # Digits already used in each row, column and box
+    used_rows = [set() for _ in range(n)]
+    used_cols = [set() for _ in range(n)]
+    used_boxes = [set() for _ in range(n)]
+    for row in range(n):
+        for col in range(n):
+            num = grid[row][col]
+            if num:
+                box = box_size * (row // box_size) + col // box_size
+                used_rows[row].add(num)
+                used_cols[col].add(num)
+                used_boxes[box].add(num)
+
+    problem = ExactCover(4 * n * n)
+    for row in range(n):
+        for col in range(n):
+            box = box_size * (row // box_size) + col // box_size
+            given = grid[row][col]
+            if given:
+                digits = [given]
+            else:
+                used = used_rows[row] | used_cols[col] | used_boxes[box]
+                digits = [num for num in range(1, n + 1) if num not in used]
+
+            for num in digits:
+                problem.add_row((row * n + col) * n + num - 1, [
+                    1 + row * n + col,
+                    1 + n * n + row * n + num - 1,
+                    1 + 2 * n * n + col * n + num - 1,
+                    1 + 3 * n * n + box * n + num - 1,
+                ])
+
+    return problem
+
+
+def solve_sudoku_dlx(grid, box_size: int | None = None, stats=None):
+    """
+    Solve a Sudoku puzzle of any box size using Dancing Links.
+    The grid is filled in place. Returns whether a solution was found.
+    """
+    try:
+        problem = sudoku_exact_cover(grid, box_size)
+    except ValueError:
+        return False
+
+    solution = next(problem.solutions(stats), None)
+    if solution is None:
+        return False
+
+    n = len(grid)
+    for identifier in solution:
+        cell, digit = divmod(identifier, n)
+        grid[cell // n][cell % n] = digit + 1
+    return True
+
+
+def count_solutions_dlx(grid, box_size: int | None = None, limit: int | None = None) -> int:
+    """Counts the solutions of a Sudoku puzzle, stopping early once limit is reached."""
+    try:
+        problem = sudoku_exact_cover(grid, box_size)
+    except ValueError:
+        return 0
+    return problem.count(limit)
@@ -0,0 +1,449 @@
+import argparse
+import random
+from collections import OrderedDict
+from itertools import permutations, product
+from typing import Iterator
+
+from propagation import PropagationEngine
+from solver import DEFAULT_BACKEND, Grid, format_grid, solve
+
+TRIPLE_ORDERS = list(permutations(range(3)))
+# Every reordering of the 9 rows that keeps a Sudoku valid: the bands can be
+# reordered and so can the rows within each band. There are 6^4 of them, and
+# the same orders apply to the columns and stacks.
+LINE_ORDERS = [
+    [3 * band + inner[band][i] for band in bands for i in range(3)]
+    for bands in TRIPLE_ORDERS
+    for inner in product(TRIPLE_ORDERS, repeat=3)
+]
+
+
+def count_solutions(grid: Grid, limit: int = 2) -> int:
+    """
+    Counts the solutions of a puzzle, stopping as soon as limit of them have
+    been found. With the default limit this tells apart puzzles with no
+    solution, exactly one and more than one.
+    """
+    try:
+        engine = PropagationEngine(grid)
+    except ValueError:
+        return 0
+    return engine.count_solutions(limit)
+
+
+def has_unique_solution(grid: Grid) -> bool:
+    return count_solutions(grid, limit=2) == 1
+
+
+def generate_puzzle(seed: int | None = None, min_clues: int = 17) -> tuple[Grid, Grid]:
+    """
+    Generates a puzzle with exactly one solution by filling a random grid and
+    then emptying its cells in random order, keeping each cell empty only
+    if the puzzle still has a single solution.
+
+    :return: The puzzle and its solution.
+    """
+    rng = random.Random(seed)
+
+    # A shuffled first row, with the rows and columns reordered afterwards,
+    # is enough to get a random solution
+    first_row = list(range(1, 10))
+    rng.shuffle(first_row)
+    solution = solve([first_row] + [[0] * 9 for _ in range(8)])
+    rows, cols = rng.choice(LINE_ORDERS), rng.choice(LINE_ORDERS)
+    solution = [[solution[row][col] for col in cols] for row in rows]
+
+    puzzle = [list(row) for row in solution]
+    clues = 81
+    cells = list(range(81))
+    rng.shuffle(cells)
+    for cell in cells:
+        if clues <= min_clues:
+            break
+        row, col = divmod(cell, 9)
+        num = puzzle[row][col]
+        puzzle[row][col] = 0
+        if has_unique_solution(puzzle):
+            clues -= 1
+        else:
+            puzzle[row][col] = num
+
+    return puzzle, solution
+
+
+class CanonicalForm:
+    """
+    The smallest form of a grid under the transformations that keep a Sudoku
+    valid: transposing, reordering bands and stacks, reordering rows within a
+    band and columns within a stack, and relabelling the digits. Digits are
+    relabelled in order of first appearance, so equivalent grids always have
+    the same key.
+
+    Cell (i, j) of the canonical grid is cell (rows[i], cols[j]) of the grid,
+    transposed first if transposed is set, with digit n relabelled labels[n].
+
+    The key is built a row at a time, keeping every partial transformation
+    that gives the smallest rows so far. Rather than trying the column
+    orders one by one, the stacks and the columns within each stack are
+    kept in groups that the rows so far cannot tell apart, and a group is
+    only split once a row holds different digits in it.
+
+    :raises: ValueError if a digit appears twice in a row or column.
+    """
+
+    def __init__(self, grid: Grid):
+        if _repeats_digit(grid):
+            raise ValueError("A digit appears twice in a row or column")
+        sources = [grid, [list(col) for col in zip(*grid)]]
+
+        # Each state holds whether the grid is transposed, the rows picked so
+        # far, the column groups, the digit labels, the next free label and
+        # the column order once the groups have all been split. The groups
+        # are blocks of interchangeable stacks, each stack being a sequence
+        # of groups of interchangeable columns.
+        stacks = tuple((tuple(range(3 * stack, 3 * stack + 3)),) for stack in range(3))
+        states = [(transposed, (), (stacks,), (0,) * 10, 1, None) for transposed in (0, 1)]
+        key: list[int] = []
+
+        for position in range(9):
+            best = None
+            survivors = []
+            for transposed, rows, blocks, labels, next_label, cols in states:
+                if position % 3 == 0:
+                    # Any band not used yet may come next
+                    used_bands = {row // 3 for row in rows}
+                    choices = [row for row in range(9) if row // 3 not in used_bands]
+                else:
+                    band = rows[-1] // 3
+                    choices = [row for row in range(3 * band, 3 * band + 3) if row not in rows]
+
+                for row in choices:
+                    values = sources[transposed][row]
+                    if cols is not None:
+                        row_key, new_labels, label = _fixed_row(values, cols, labels, next_label)
+                        refinements = [(blocks, new_labels, label, cols)]
+                    else:
+                        row_key, plan = _split_row(values, blocks, labels, next_label)
+                        refinements = None
+
+                    if best is None or row_key < best:
+                        best = row_key
+                        survivors = []
+                    elif row_key > best:
+                        continue
+                    if refinements is None:
+                        refinements = _refinements(values, plan, labels, next_label)
+                    survivors.extend(
+                        (transposed, rows + (row,), new_blocks, new_labels, label, new_cols)
+                        for new_blocks, new_labels, label, new_cols in refinements
+                    )
+            key.extend(best)
+            states = survivors
+
+        # Columns or stacks still grouped together are identical, so any order will do
+        transposed, rows, blocks, labels, _, cols = states[0]
+        if cols is None:
+            cols = [col for block in blocks for stack in block for group in stack for col in group]
+        self.key = key
+        self.rows = list(rows)
+        self.cols = list(cols)
+        self.transposed = bool(transposed)
+        self.labels = list(labels)
+
+    def key_string(self) -> str:
+        return "".join(map(str, self.key))
+
+    def to_canonical(self, solution: Grid) -> Grid:
+        """Applies the transformations that give the canonical form to a solution of the grid."""
+        if self.transposed:
+            solution = [list(col) for col in zip(*solution)]
+
+        # Digits left out of the grid have no label yet, so give them the spare ones
+        labels = list(self.labels)
+        spare = iter(sorted(set(range(1, 10)) - set(labels)))
+        for num in range(1, 10):
+            if not labels[num]:
+                labels[num] = next(spare)
+
+        return [[labels[solution[row][col]] for col in self.cols] for row in self.rows]
+
+    def from_canonical(self, solution: Grid) -> Grid:
+        """Undoes the transformations that give the canonical form on a canonical solution."""
+        digits = [0] * 10
+        for num, label in enumerate(self.labels):
+            if label:
+                digits[label] = num
+        spare = iter(sorted(set(range(1, 10)) - set(digits)))
+        for label in range(1, 10):
+            if not digits[label]:
+                digits[label] = next(spare)
+
+        result = [[0] * 9 for _ in range(9)]
+        for i, row in enumerate(self.rows):
+            for j, col in enumerate(self.cols):
+                result[row][col] = digits[solution[i][j]]
+
+        if self.transposed:
+            result = [list(col) for col in zip(*result)]
+        return result
+
+
+def _fixed_row(values: list[int], cols: tuple, labels: tuple, next_label: int) -> tuple[list[int], tuple, int]:
+    """Finds a row's key once the column order is fixed, labelling any new digits as they come."""
+    if next_label == 10:
+        return [labels[values[col]] for col in cols], labels, next_label
+
+    new_labels = list(labels)
+    label = next_label
+    row_key = []
+    for col in cols:
+        num = values[col]
+        if num and not new_labels[num]:
+            new_labels[num] = label
+            label += 1
+        row_key.append(new_labels[num])
+    return row_key, tuple(new_labels), label
+
+
+def _split_stack(values: list[int], stack: tuple, labels: tuple, label: int) -> tuple[list[int], list]:
+    """
+    Finds the smallest key of a row within one stack. In each group of
+    columns the empty cells come first, then the labelled digits in order,
+    then the digits without a label, which take the labels from label on
+    whatever order they go in.
+
+    :return: The key and, for each group, its empty columns, its labelled
+             columns in order and its unlabelled columns.
+    """
+    stack_key = []
+    splits = []
+    for group in stack:
+        empty = []
+        labelled = []
+        unlabelled = []
+        for col in group:
+            num = values[col]
+            if not num:
+                empty.append(col)
+            elif labels[num]:
+                labelled.append((labels[num], col))
+            else:
+                unlabelled.append(col)
+        if len(labelled) > 1:
+            labelled.sort()
+        stack_key.extend([0] * len(empty))
+        stack_key.extend(num for num, _ in labelled)
+        stack_key.extend(range(label, label + len(unlabelled)))
+        label += len(unlabelled)
+        splits.append((empty, [col for _, col in labelled], unlabelled))
+    return stack_key, splits
+
+
+def _split_row(values: list[int], blocks: tuple, labels: tuple, next_label: int) -> tuple[list[int], list]:
+    """
+    Finds the smallest key a row can have given the column groups. The
+    stacks in each block are sorted by their own keys, with their new
+    digits labelled from the same point so the keys compare fairly.
+
+    :return: The row's key and a plan of the runs of stacks with equal
+             keys, each with the splits of its stacks and whether the run
+             is empty in this row.
+    """
+    row_key = []
+    plan = []
+    label = next_label
+    for block in blocks:
+        base = label
+        parts = sorted((_split_stack(values, stack, labels, base) + (stack,) for stack in block),
+                       key=lambda part: part[0])
+        run: list = []
+        for stack_key, splits, stack in parts:
+            if run and stack_key != run[0][0]:
+                plan.append(([(stack, splits) for _, splits, stack in run], not any(run[0][0])))
+                run = []
+            run.append((stack_key, splits, stack))
+            new_digits = sum(len(unlabelled) for _, _, unlabelled in splits)
+            # Later stacks in the block take the labels after this one's
+            row_key.extend(num + label - base if num >= base else num for num in stack_key)
+            label += new_digits
+        plan.append(([(stack, splits) for _, splits, stack in run], not any(run[0][0])))
+    return row_key, plan
+
+
+def _refinements(values: list[int], plan: list, labels: tuple, next_label: int) -> Iterator[tuple]:
+    """
+    Yields the column groups, labels and next free label left by each way
+    of ordering a row's tied stacks and unlabelled digits, since the order
+    decides their labels, along with the column order if it is now fixed.
+    Runs of stacks that are empty in the row stay grouped together.
+    """
+    # The column order is fixed once every stack is on its own and no two
+    # columns are left empty together, whichever way the ties are broken
+    fixed = all(
+        len(run) == 1 and all(len(group) == 1 for group in run[0][0]) if empty
+        else all(len(empty_cols) <= 1 for _, splits in run for empty_cols, _, _ in splits)
+        for run, empty in plan
+    )
+
+    for orders in product(*([run] if empty else permutations(run) for run, empty in plan)):
+        ordered = [
+            (stack, splits)
+            for order, (_, empty) in zip(orders, plan) if not empty
+            for stack, splits in order
+        ]
+        for digit_orders in product(*(permutations(unlabelled)
+                                      for _, splits in ordered for _, _, unlabelled in splits)):
+            digit_orders = iter(digit_orders)
+            new_labels = list(labels)
+            label = next_label
+            if fixed:
+                cols = []
+                for order, (_, empty) in zip(orders, plan):
+                    for stack, splits in order:
+                        if empty:
+                            cols.extend(group[0] for group in stack)
+                            continue
+                        for empty_cols, labelled, _ in splits:
+                            cols.extend(empty_cols)
+                            cols.extend(labelled)
+                            for col in next(digit_orders):
+                                new_labels[values[col]] = label
+                                label += 1
+                                cols.append(col)
+                yield None, tuple(new_labels), label, tuple(cols)
+                continue
+
+            blocks = []
+            for order, (_, empty) in zip(orders, plan):
+                if empty:
+                    blocks.append(tuple(stack for stack, _ in order))
+                    continue
+                for _, splits in order:
+                    groups = []
+                    for empty_cols, labelled, _ in splits:
+                        if empty_cols:
+                            groups.append(tuple(empty_cols))
+                        groups.extend((col,) for col in labelled)
+                        for col in next(digit_orders):
+                            new_labels[values[col]] = label
+                            label += 1
+                            groups.append((col,))
+                    blocks.append((tuple(groups),))
+            yield tuple(blocks), tuple(new_labels), label, None
+
+
+def _repeats_digit(grid: Grid) -> bool:
+    for line in [*grid, *zip(*grid)]:
+        digits = [num for num in line if num]
+        if len(digits) != len(set(digits)):
+            return True
+    return False
+
+
+def invariant(grid: Grid) -> tuple:
+    """
+    A summary of a grid that equivalent grids share: how often each digit
+    appears, and how many clues each band's rows and each stack's columns
+    hold. Grids with different summaries cannot be equivalent, so their
+    canonical forms never need comparing.
+    """
+    digit_counts = [0] * 10
+    row_counts = [0] * 9
+    col_counts = [0] * 9
+    for row in range(9):
+        for col in range(9):
+            num = grid[row][col]
+            if num:
+                digit_counts[num] += 1
+                row_counts[row] += 1
+                col_counts[col] += 1
+
+    def profile(counts):
+        return tuple(sorted(tuple(sorted(counts[3 * band:3 * band + 3])) for band in range(3)))
+
+    return tuple(sorted(digit_counts[1:])), tuple(sorted((profile(row_counts), profile(col_counts))))
+
+
+class CanonicalCache:
+    """
+    Caches solutions so that a puzzle equivalent to one already solved (a
+    relabelling, transposition or row and column reordering of it) is
+    answered by transforming the earlier solution instead of solving again.
+
+    Canonical forms are only worked out for puzzles sharing an invariant
+    with a cached one. One takes around a millisecond for a typical puzzle,
+    a little less than solving it with the propagation backend, so a hit
+    saves most with slower backends and hard puzzles, while a puzzle that
+    shares an invariant with a cached one but is not equivalent to it costs
+    that much more than an uncached solve. Nearly full grids take far
+    longer to put in canonical form, so the cache is meant for puzzles.
+    """
+
+    def __init__(self, maxsize: int = 100_000, backend: str = DEFAULT_BACKEND):
+        self.maxsize = maxsize
+        self.backend = backend
+        # Each invariant maps to [grid, solution, canonical form or None] entries
+        self._entries: OrderedDict[tuple, list[list]] = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def solve(self, grid: Grid) -> Grid | None:
+        """Solves a puzzle, reusing the solution of an equivalent puzzle if there is one."""
+        if _repeats_digit(grid):
+            # Such a grid has no solution, and no canonical form to cache it by
+            self.misses += 1
+            return solve(grid, self.backend)
+
+        key = invariant(grid)
+        entries = self._entries.get(key)
+        form = None
+
+        if entries is not None:
+            self._entries.move_to_end(key)
+            form = CanonicalForm(grid)
+            for entry in entries:
+                if entry[2] is None:
+                    entry[2] = CanonicalForm(entry[0])
+                if entry[2].key == form.key:
+                    self.hits += 1
+                    if entry[1] is None:
+                        return None
+                    return form.from_canonical(entry[2].to_canonical(entry[1]))
+
+        self.misses += 1
+        solution = solve(grid, self.backend)
+        self._entries.setdefault(key, []).append([[list(row) for row in grid], solution, form])
+        self._size += 1
+        while self._size > self.maxsize:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+        return solution
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def info(self) -> dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate(),
+            "currsize": self._size,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate Sudoku puzzles with a unique solution.")
+    parser.add_argument("count", type=int, help="Number of puzzles to generate")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the random number generator")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for _ in range(args.count):
+        puzzle, _ = generate_puzzle(rng.randrange(1 << 32))
+        print(format_grid(puzzle))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+from collections import deque
+from contextlib import nullcontext
+
+from sudoku_improved import ALL_DIGITS, POPCOUNT
+
+# Cells are numbered 0 to 80 row by row. Units are the 9 rows, 9 columns
+# and 9 subgrids, numbered 0 to 26 in that order.
+UNITS = (
+    [[row * 9 + col for col in range(9)] for row in range(9)]
+    + [[row * 9 + col for row in range(9)] for col in range(9)]
+    + [
+        [(3 * (box // 3) + i) * 9 + 3 * (box % 3) + j for i in range(3) for j in range(3)]
+        for box in range(9)
+    ]
+)
+CELL_UNITS = [[unit for unit in range(27) if cell in UNITS[unit]] for cell in range(81)]
+PEERS = [
+    sorted({peer for unit in CELL_UNITS[cell] for peer in UNITS[unit]} - {cell})
+    for cell in range(81)
+]
+
+# Work items below 81 are cells whose domain became a single digit, the
+# rest are units (offset by 81) whose cells' domains have changed.
+UNIT_OFFSET = 81
+
+RULES = ("naked_single", "hidden_single", "naked_pair")
+
+
+class PropagationEngine:
+    """
+    Solves Sudoku puzzles by keeping the domain (the mask of candidate
+    digits) of every cell and narrowing the domains with three rules:
+
+    - naked single: a cell with one candidate left removes it from its peers
+    - hidden single: a digit with one possible cell left in a unit goes there
+    - naked pair: two cells in a unit with the same two candidates remove
+      them from the rest of the unit
+
+    Changes to the domains are recorded on a trail so that a guess made
+    while backtracking can be undone by restoring the trail to a mark.
+    """
+
+    def __init__(self, grid):
+        """
+        :raises: ValueError if the digits already in the grid clash.
+        """
+        self.domains = [ALL_DIGITS] * 81
+        self.trail = []
+        self.queue = deque()
+        self.queued = bytearray(81 + 27)
+
+        # How many candidates each rule removed
+        self.pruned = dict.fromkeys(RULES, 0)
+        self.guesses = 0
+        self.backtracks = 0
+
+        for row in range(9):
+            for col in range(9):
+                num = grid[row][col]
+                if num and not self.assign(row * 9 + col, num):
+                    raise ValueError(f"{num} at ({row}, {col}) clashes with another digit")
+
+        if not self.propagate():
+            raise ValueError("The puzzle has no solution")
+
+    def _push(self, item):
+        if not self.queued[item]:
+            self.queued[item] = 1
+            self.queue.append(item)
+
+    def eliminate(self, cell, mask, rule=None) -> bool:
+        """
+        Removes the digits in mask from the domain of a cell.
+        Returns False if that leaves the cell without candidates.
+        """
+        domain = self.domains[cell]
+        removed = domain & mask
+        if not removed:
+            return True
+
+        domain &= ~mask
+        self.trail.append((cell, self.domains[cell]))
+        self.domains[cell] = domain
+        if rule is not None:
+            self.pruned[rule] += POPCOUNT[removed]
+
+        if domain == 0:
+            return False
+        if POPCOUNT[domain] == 1:
+            self._push(cell)
+        for unit in CELL_UNITS[cell]:
+            self._push(UNIT_OFFSET + unit)
+        return True
+
+    def assign(self, cell, num, rule=None) -> bool:
+        """Removes every candidate but num from the domain of a cell."""
+        return self.eliminate(cell, ALL_DIGITS & ~(1 << num), rule)
+
+    def propagate(self) -> bool:
+        """
+        Applies the rules until no domain changes any more.
+        Returns False if some cell is left without candidates.
+        """
+        domains = self.domains
+
+        while self.queue:
+            item = self.queue.popleft()
+            self.queued[item] = 0
+
+            if item < UNIT_OFFSET:
+                digit = domains[item]
+                for peer in PEERS[item]:
+                    if not self.eliminate(peer, digit, "naked_single"):
+                        return self._fail()
+            elif not self._propagate_unit(UNITS[item - UNIT_OFFSET]):
+                return self._fail()
+
+        return True
+
+    def _propagate_unit(self, unit) -> bool:
+        domains = self.domains
+
+        # Digits that are candidates in at least one cell, and in at least two
+        once = twice = 0
+        for cell in unit:
+            twice |= once & domains[cell]
+            once |= domains[cell]
+
+        if once != ALL_DIGITS:
+            return False  # Some digit has nowhere to go
+
+        hidden = once & ~twice
+        while hidden:
+            bit = hidden & -hidden
+            hidden ^= bit
+            for cell in unit:
+                if domains[cell] & bit:
+                    if domains[cell] != bit and not self.eliminate(cell, ~bit & ALL_DIGITS, "hidden_single"):
+                        return False
+                    break
+
+        pairs = {}
+        for cell in unit:
+            domain = domains[cell]
+            if POPCOUNT[domain] != 2:
+                continue
+            if domain not in pairs:
+                pairs[domain] = cell
+                continue
+            for other in unit:
+                if other != cell and other != pairs[domain]:
+                    if not self.eliminate(other, domain, "naked_pair"):
+                        return False
+
+        return True
+
+    def _fail(self) -> bool:
+        for item in self.queue:
+            self.queued[item] = 0
+        self.queue.clear()
+        return False
+
+    def mark(self) -> int:
+        """Returns a mark that undo can restore the domains to."""
+        return len(self.trail)
+
+    def undo(self, mark):
+        """Restores every domain changed since the mark was taken."""
+        trail = self.trail
+        domains = self.domains
+        while len(trail) > mark:
+            cell, domain = trail.pop()
+            domains[cell] = domain
+
+    def _choose_cell(self):
+        """Returns the undecided cell with the fewest candidates, or None if there is none."""
+        domains = self.domains
+
+        cell = None
+        best_count = 10
+        for candidate in range(81):
+            count = POPCOUNT[domains[candidate]]
+            if 1 < count < best_count:
+                cell = candidate
+                best_count = count
+                if count == 2:
+                    break
+        return cell
+
+    def search(self, stats=None, depth=0) -> bool:
+        """
+        Backtracks over the candidates of the cell with the fewest of them,
+        propagating after every guess. An optional SearchStats (see
+        search_stats.py) records every guess and backtrack.
+        """
+        cell = self._choose_cell()
+        if cell is None:
+            return True  # Every cell has a single candidate
+
+        mask = self.domains[cell]
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+
+            self.guesses += 1
+            if stats is not None:
+                stats.node(depth + 1, (cell, bit.bit_length() - 1))
+            mark = self.mark()
+            if self.assign(cell, bit.bit_length() - 1) and self.propagate() and self.search(stats, depth + 1):
+                return True
+            self._fail()
+            self.undo(mark)
+            self.backtracks += 1
+            if stats is not None:
+                stats.backtrack()
+
+        return False
+
+    def count_solutions(self, limit=2) -> int:
+        """
+        Counts the solutions by searching every branch, stopping as soon as
+        limit of them have been found.
+        """
+        cell = self._choose_cell()
+        if cell is None:
+            return 1
+
+        found = 0
+        mask = self.domains[cell]
+        while mask and found < limit:
+            bit = mask & -mask
+            mask ^= bit
+
+            self.guesses += 1
+            mark = self.mark()
+            if self.assign(cell, bit.bit_length() - 1) and self.propagate():
+                found += self.count_solutions(limit - found)
+            self._fail()
+            self.undo(mark)
+
+        return found
+
+    def write_grid(self, grid):
+        """Fills the grid with the digits of the cells that have a single candidate."""
+        for cell, domain in enumerate(self.domains):
+            if POPCOUNT[domain] == 1:
+                grid[cell // 9][cell % 9] = domain.bit_length() - 1
+
+    def report(self) -> dict[str, int]:
+        """Returns how many candidates each rule pruned, with the search statistics."""
+        return {**self.pruned, "guesses": self.guesses, "backtracks": self.backtracks}
+
+
+def solve_sudoku_propagation(grid, stats=None):
+    """
+    Solve the Sudoku puzzle using constraint propagation with backtracking.
+    An optional SearchStats (see search_stats.py) records the search, the
+    candidates the rules removed and the time spent in each phase.
+    """
+    # The phases are only timed when there are stats to record them in
+    phase = stats.phase if stats is not None else lambda name: nullcontext()
+    try:
+        with phase("propagation"):
+            engine = PropagationEngine(grid)
+    except ValueError:
+        return False
+    with phase("search"):
+        solved = engine.search(stats)
+    if stats is not None:
+        # The rules count what they removed themselves, so nothing is added to their inner loops
+        stats.propagated(sum(engine.pruned.values()))
+    if not solved:
+        return False
+    engine.write_grid(grid)
+    return True
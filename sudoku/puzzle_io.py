@@ -0,0 +1,123 @@
+import mmap
+import os
+from typing import BinaryIO, Iterator
+
+PUZZLE_LENGTH = 81
+
+
+def _map_file(path: str) -> mmap.mmap | None:
+    """Maps a file read-only, returning None for an empty file since those cannot be mapped."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _close(mapped: mmap.mmap, view: memoryview):
+    view.release()
+    try:
+        mapped.close()
+    except BufferError:
+        # A caller still holds a view into the file, which keeps it mapped
+        # until that view is garbage collected
+        pass
+
+
+def iter_puzzles(path: str) -> Iterator[memoryview]:
+    """
+    Memory-maps a file with one puzzle per line and yields each line as a
+    view into the mapping, without the line ending. Nothing is copied, so a
+    file of any size is read with constant memory, but the views are only
+    valid while the generator is running and should be copied with bytes()
+    to be kept.
+    """
+    mapped = _map_file(path)
+    if mapped is None:
+        return
+
+    view = memoryview(mapped)
+    try:
+        size = len(mapped)
+        start = 0
+        while start < size:
+            end = mapped.find(b"\n", start)
+            if end == -1:
+                end = size
+            line_end = end - 1 if end > start and mapped[end - 1] == ord("\r") else end
+            yield view[start:line_end]
+            start = end + 1
+    finally:
+        _close(mapped, view)
+
+
+def iter_chunks(path: str, lines_per_chunk: int = 256) -> Iterator[memoryview]:
+    """
+    Memory-maps a file and yields views of consecutive blocks of whole
+    lines, each of up to lines_per_chunk lines including their line endings.
+    Handing a worker a block rather than separate puzzles means a single
+    copy per block when it is sent to another process.
+
+    The views are only valid while the generator is running.
+    """
+    mapped = _map_file(path)
+    if mapped is None:
+        return
+
+    view = memoryview(mapped)
+    try:
+        size = len(mapped)
+        start = 0
+        while start < size:
+            end = start
+            for _ in range(lines_per_chunk):
+                end = mapped.find(b"\n", end)
+                if end == -1:
+                    end = size
+                    break
+                end += 1
+                if end >= size:
+                    break
+            yield view[start:end]
+            start = end
+    finally:
+        _close(mapped, view)
+
+
+class SolutionWriter:
+    """
+    Writes solutions one per line, collecting them in a buffer that is only
+    written out once it holds buffer_size bytes, to keep the number of writes
+    low for large batches.
+    """
+
+    def __init__(self, path: str, buffer_size: int = 1 << 20):
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._buffer = bytearray()
+        self._file: BinaryIO = open(path, "wb", buffering=0)
+
+    def write(self, solution: str | bytes):
+        """Adds a solution, with '' for a puzzle that could not be solved."""
+        if isinstance(solution, str):
+            solution = solution.encode("ascii")
+        self._buffer += solution
+        self._buffer += b"\n"
+        self.count += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer.clear()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,218 @@
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from math import isqrt
+from typing import Callable, Iterable, Iterator
+
+from dlx import solve_sudoku_dlx
+from propagation import solve_sudoku_propagation
+from puzzle_io import SolutionWriter, iter_chunks
+from sudoku_improved import solve_sudoku, solve_sudoku_bitmask
+
+Grid = list[list[int]]
+
+# Every backend solves the grid in place and returns whether it succeeded.
+# They also take an optional stats keyword argument (see search_stats.py).
+# Only dlx handles grids other than 9 x 9.
+BACKENDS: dict[str, Callable[..., bool]] = {
+    "improved": solve_sudoku,
+    "bitmask": solve_sudoku_bitmask,
+    "propagation": solve_sudoku_propagation,
+    "dlx": solve_sudoku_dlx,
+}
+DEFAULT_BACKEND = "propagation"
+
+
+def parse_grid(line: str) -> Grid:
+    """
+    Parses a puzzle in the standard 81 character format, reading the cells
+    row by row with '0' or '.' for the empty ones.
+
+    :raises: ValueError if the line is not a valid puzzle.
+    """
+    line = line.strip()
+    if len(line) != 81:
+        raise ValueError(f"Expected 81 characters but got {len(line)}")
+
+    cells = []
+    for char in line:
+        if char == ".":
+            cells.append(0)
+        elif char.isdigit():
+            cells.append(int(char))
+        else:
+            raise ValueError(f"Invalid character {char!r}")
+
+    return [cells[row * 9:row * 9 + 9] for row in range(9)]
+
+
+def format_grid(grid: Grid) -> str:
+    """Formats a grid in the standard 81 character format."""
+    return "".join(str(cell) for row in grid for cell in row)
+
+
+def is_consistent(grid: Grid) -> bool:
+    """Checks that no filled cell clashes with another in its row, column or subgrid."""
+    n = len(grid)
+    box_size = isqrt(n)
+    seen = set()
+    for row in range(n):
+        for col in range(n):
+            num = grid[row][col]
+            if num == 0:
+                continue
+            box = box_size * (row // box_size) + col // box_size
+            keys = (("row", row, num), ("col", col, num), ("box", box, num))
+            if any(key in seen for key in keys):
+                return False
+            seen.update(keys)
+    return True
+
+
+def solve(grid: Grid, backend: str = DEFAULT_BACKEND, stats=None) -> Grid | None:
+    """
+    Solves a puzzle without modifying it.
+
+    :param grid: The puzzle, as 9 rows of 9 numbers with 0 for the empty cells.
+    :param backend: The name of the solver to use, one of BACKENDS.
+    :param stats: An optional SearchStats to fill in as the backend searches.
+    :return: The solved grid, or None if the puzzle has no solution.
+    """
+    grid = [list(row) for row in grid]
+    if not is_consistent(grid):
+        return None
+    if BACKENDS[backend](grid, stats=stats):
+        return grid
+    return None
+
+
+def solve_line(line: str, backend: str = DEFAULT_BACKEND) -> str:
+    """Solves a puzzle in the 81 character format, returning '' if it cannot be solved."""
+    try:
+        solution = solve(parse_grid(line), backend)
+    except ValueError:
+        return ""
+    return format_grid(solution) if solution is not None else ""
+
+
+def _solve_chunk(lines: list[str] | bytes, backend: str, vectorized: bool) -> list[str]:
+    if isinstance(lines, bytes):
+        # A block of whole lines read straight from a puzzle file, split
+        # only on '\n' as iter_chunks does, so that other line breaks such
+        # as '\x0c' stay part of a line and every line gives one solution
+        text = lines.decode("ascii", errors="replace")
+        lines = text.split("\n")
+        if text.endswith("\n"):
+            lines.pop()
+        lines = [line[:-1] if line.endswith("\r") else line for line in lines]
+    if vectorized:
+        # Imported here since the vectorised module builds on this one
+        from vectorized import solve_lines
+        return solve_lines(lines, backend)
+    return [solve_line(line, backend) for line in lines]
+
+
+def _solve_chunks(chunks: Iterable[list[str] | bytes], workers: int | None, backend: str,
+                  vectorized: bool) -> Iterator[list[str]]:
+    """
+    Solves chunks of puzzles across a pool of processes, yielding the
+    solutions of each chunk in the same order as the chunks. Only a couple
+    of chunks per worker are in flight at a time, so the input is never
+    read far ahead of the output.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = 2 * workers
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+
+        for chunk in chunks:
+            pending.append(executor.submit(_solve_chunk, chunk, backend, vectorized))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def solve_batch(puzzles: Iterable[str], workers: int | None = None, chunksize: int = 256,
+                backend: str = DEFAULT_BACKEND, vectorized: bool = False) -> Iterator[str]:
+    """
+    Solves a stream of puzzles across a pool of processes, yielding the
+    solutions in the same order as the puzzles.
+
+    The puzzles are sent to the workers in chunks of chunksize. With
+    vectorized set, each chunk first has its singles propagated with NumPy
+    across all of its puzzles at once, and only the puzzles left unsolved
+    go through the backend.
+    """
+    puzzles = iter(puzzles)
+    chunks = iter(lambda: list(islice(puzzles, chunksize)), [])
+    for solutions in _solve_chunks(chunks, workers, backend, vectorized):
+        yield from solutions
+
+
+class BatchReport:
+    """Statistics about a batch of puzzles that was solved."""
+
+    def __init__(self, puzzles: int, solved: int, elapsed: float):
+        self.puzzles = puzzles
+        self.solved = solved
+        self.elapsed = elapsed
+
+    def rate(self) -> float:
+        """Returns the number of puzzles solved per second."""
+        return self.puzzles / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self):
+        return (
+            f"Solved {self.solved} of {self.puzzles} puzzle(s) in {self.elapsed:.3f}s "
+            f"({self.rate():.1f} puzzles/sec)"
+        )
+
+
+def solve_file(input_path: str, output_path: str, workers: int | None = None, chunksize: int = 256,
+               backend: str = DEFAULT_BACKEND, vectorized: bool = False) -> BatchReport:
+    """
+    Solves a file with one puzzle per line, writing one solution per line to
+    the output file. Lines that cannot be solved are left empty.
+
+    The input is memory-mapped and handed to the workers in blocks of
+    chunksize lines, so files of any size are solved with constant memory.
+    """
+    puzzles = solved = 0
+    start = time.perf_counter()
+
+    # Copy each block out of the mapping so it can be sent to a worker
+    blocks = (bytes(block) for block in iter_chunks(input_path, chunksize))
+    with SolutionWriter(output_path) as out:
+        for solutions in _solve_chunks(blocks, workers, backend, vectorized):
+            for solution in solutions:
+                out.write(solution)
+                if solution:
+                    solved += 1
+            puzzles += len(solutions)
+
+    return BatchReport(puzzles, solved, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve a file of Sudoku puzzles, one per line.")
+    parser.add_argument("input", help="File with one 81 character puzzle per line")
+    parser.add_argument("output", help="File to write the solutions to")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--chunksize", type=int, default=256, help="Puzzles sent to a worker at a time")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=DEFAULT_BACKEND)
+    parser.add_argument("--vectorized", action="store_true", help="Propagate singles across each chunk with NumPy first")
+    args = parser.parse_args()
+
+    report = solve_file(args.input, args.output, args.workers, args.chunksize, args.backend, args.vectorized)
+    print(report, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,6 @@
-import numpy as np
-from grid import grid
+from contextlib import nullcontext
 
-print("\nGrid:")
-print(np.matrix(grid))
+import numpy as np
 
 def is_valid_move(grid, row, col, num):
     """
@@ -68,15 +66,19 @@ def enforce_arc_consistency(grid):
                 queue.extend((subgrid_row + i, subgrid_col + j) for i in range(3) for j in range(3) if grid[subgrid_row + i][subgrid_col + j] == 0)
     return True # If the loop completes without returning False, the grid is consistent
 
-def solve_sudoku(grid):
+def solve_sudoku(grid, stats=None):
     """
     Solve the Sudoku puzzle using backtracking with arc consistency and heuristic selection of cells and values.
+    An optional SearchStats (see search_stats.py) records the search and the time spent in each phase.
     """
-    if not enforce_arc_consistency(grid):
-        return False
-    return backtrack_solve(grid)
+    phase = stats.phase if stats is not None else lambda name: nullcontext()
+    with phase("arc_consistency"):
+        if not enforce_arc_consistency(grid):
+            return False
+    with phase("search"):
+        return backtrack_solve(grid, stats)
 
-def backtrack_solve(grid):
+def backtrack_solve(grid, stats=None, depth=0):
     """
     Recursively solve the Sudoku puzzle using backtracking with heuristic selection.
     """
@@ -89,19 +91,151 @@ def backtrack_solve(grid):
     for num in sorted(possible_values):
         if is_valid_move(grid, row, col, num): #check if placing num is valid
             grid[row][col] = num #update grid
+            if stats is not None:
+                stats.node(depth + 1, (row, col, num))
             enforce_arc_consistency(grid)
-            if backtrack_solve(grid):  # Recursively solve the Sudoku puzzle
+            if backtrack_solve(grid, stats, depth + 1):  # Recursively solve the Sudoku puzzle
                 return True
             grid[row][col] = 0  # Backtrack if the current configuration is not valid
+            if stats is not None:
+                stats.backtrack()
     
     return False  # No valid number found for the current empty cell
 
-# Solve the Sudoku puzzle
-if solve_sudoku(grid):
-    print("\nSolution:")
+# Digits are stored as bits 1 to 9 of a mask, so bit n is set when n is a candidate
+ALL_DIGITS = 0b1111111110
+POPCOUNT = [bin(mask).count("1") for mask in range(1 << 10)]
+
+
+class SolverState:
+    """
+    Tracks the digits already used in every row, column and subgrid as
+    bitmasks, updating them as digits are placed and removed. The candidates
+    for a cell are then a couple of bitwise operations away, instead of three
+    sets rebuilt from the grid every time.
+    """
+
+    def __init__(self, grid):
+        """
+        :raises: ValueError if the digits already in the grid clash.
+        """
+        self.grid = grid
+        self.rows = [0] * 9
+        self.cols = [0] * 9
+        self.boxes = [0] * 9
+        self.empty_cells = []
+
+        for row in range(9):
+            for col in range(9):
+                num = grid[row][col]
+                if num == 0:
+                    self.empty_cells.append((row, col))
+                elif not self.candidates(row, col) & (1 << num):
+                    raise ValueError(f"{num} appears twice around ({row}, {col})")
+                else:
+                    self.place(row, col, num)
+
+    def candidates(self, row, col):
+        """
+        Get the mask of values that can be placed in the cell at (row, col).
+        """
+        return ALL_DIGITS & ~(self.rows[row] | self.cols[col] | self.boxes[3 * (row // 3) + col // 3])
+
+    def place(self, row, col, num):
+        """
+        Place 'num' at position (row, col) and mark it as used.
+        """
+        bit = 1 << num
+        self.grid[row][col] = num
+        self.rows[row] |= bit
+        self.cols[col] |= bit
+        self.boxes[3 * (row // 3) + col // 3] |= bit
+
+    def undo(self, row, col, num):
+        """
+        Remove 'num' from position (row, col), making it available again.
+        """
+        bit = ~(1 << num)
+        self.grid[row][col] = 0
+        self.rows[row] &= bit
+        self.cols[col] &= bit
+        self.boxes[3 * (row // 3) + col // 3] &= bit
+
+    def find_empty_cell(self):
+        """
+        Find the empty cell with the fewest candidates (minimum remaining values).
+        Returns the row, column and candidate mask, or None if the grid is full.
+        """
+        grid = self.grid
+        best = None
+        best_count = 10
+        for row, col in self.empty_cells:
+            if grid[row][col] != 0:
+                continue
+            mask = self.candidates(row, col)
+            count = POPCOUNT[mask]
+            if count < best_count:
+                best = (row, col, mask)
+                best_count = count
+                if count <= 1:
+                    break  # Cannot do better than a dead end or a forced value
+        return best
+
+
+def backtrack_solve_bitmask(state, stats=None, depth=0):
+    """
+    Recursively solve the Sudoku puzzle using backtracking, selecting cells by
+    minimum remaining values from the bitmasks kept in the solver state.
+    """
+    cell = state.find_empty_cell()
+    if cell is None:  # If no empty cell is found, the puzzle is solved
+        return True
+
+    row, col, mask = cell
+    while mask:
+        bit = mask & -mask  # Lowest remaining candidate
+        mask ^= bit
+        num = bit.bit_length() - 1
+        state.place(row, col, num)
+        if stats is not None:
+            stats.node(depth + 1, (row, col, num))
+        if backtrack_solve_bitmask(state, stats, depth + 1):
+            return True
+        state.undo(row, col, num)  # Backtrack if the current configuration is not valid
+        if stats is not None:
+            stats.backtrack()
+
+    return False
+
+
+def solve_sudoku_bitmask(grid, stats=None):
+    """
+    Solve the Sudoku puzzle using backtracking with bitmask candidate tracking.
+    An optional SearchStats (see search_stats.py) records the search.
+    """
+    try:
+        state = SolverState(grid)
+    except ValueError:
+        return False
+    return backtrack_solve_bitmask(state, stats)
+
+
+def main():
+    from grid import grid
+
+    print("\nGrid:")
     print(np.matrix(grid))
-else:
-    print("\nNo solution exists.")
+
+    # Solve the Sudoku puzzle
+    if solve_sudoku(grid):
+        print("\nSolution:")
+        print(np.matrix(grid))
+    else:
+        print("\nNo solution exists.")
+
+
+if __name__ == "__main__":
+    main()
 
 
 #Improvement by reduction of search space, early prunning of invalid choices, improved heuristic selection, systematic approch(rarely overlook valid options)
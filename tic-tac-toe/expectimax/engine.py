@@ -0,0 +1,213 @@
+# The headless game logic for Tic Tac Toe, without any dependency on tkinter,
+# so the AI can be imported, benchmarked and run on machines without a display
+from math import fsum
+
+# Symbol used by the human player
+PLAYER = 'X'
+# Symbol used by the computer
+OPPONENT = 'O'
+# Symbol used for an empty square
+EMPTY = ' '
+
+# Rows, columns and diagonals of the board, with squares numbered 0 to 8 row by row
+WINNING_COMBINATIONS = [(0, 1, 2), (3, 4, 5), (6, 7, 8),
+                        (0, 3, 6), (1, 4, 7), (2, 5, 8),
+                        (0, 4, 8), (2, 4, 6)]
+
+
+# Function to create an empty board
+def new_board():
+    """
+    Create an empty board.
+    """
+    # The board is a list of 9 symbols
+    return [EMPTY] * 9
+
+
+# Function to get available moves on a board
+def available_moves(board):
+    """
+    Get available moves on the board.
+    """
+    # Return a list of indices where the board contains an empty space
+    return [i for i in range(9) if board[i] == EMPTY]
+
+
+# Function to check if a player has won
+def check_winner(board, player):
+    """
+    Check if a player has won.
+    """
+    # Check if any winning combination is achieved by the player
+    for combination in WINNING_COMBINATIONS:
+        if all(board[i] == player for i in combination):
+            return True
+    return False
+
+
+# Function to check if the game is over
+def game_over(board):
+    """
+    Check if the game is over.
+    """
+    # Check if either player has won or if the board is full
+    return check_winner(board, PLAYER) or check_winner(board, OPPONENT) or EMPTY not in board
+
+
+# Function to evaluate a board
+def evaluate(board):
+    """
+    Evaluate the game state.
+    """
+    # If player wins, return 1; if opponent wins, return -1; if it's a tie, return 0
+    if check_winner(board, PLAYER):
+        return 1
+    elif check_winner(board, OPPONENT):
+        return -1
+    else:
+        return 0
+
+
+# Function to perform expectimax search
+def expectimax(board, depth, player, stats=None):
+    """
+    Perform expectimax search.
+
+    The board is changed while searching but restored before returning.
+    An optional SearchStats (see search_stats.py) records every move tried.
+    """
+    # Base case: if the game is over, return the evaluation of the current game state
+    if game_over(board):
+        return evaluate(board)
+
+    if player == PLAYER:
+        # Max player's turn
+        best_score = float('-inf')
+        # Iterate over available moves
+        for move in available_moves(board):
+            # Make the move for the player
+            board[move] = player
+            if stats is not None:
+                stats.node(depth+1, move)
+            # Recursively call expectimax for the opponent
+            score = expectimax(board, depth+1, OPPONENT, stats)
+            # Undo the move
+            board[move] = EMPTY
+            # Update the best score
+            best_score = max(score, best_score)
+        return best_score
+    else:
+        # Chance node (opponent's turn)
+        scores = []
+        # Iterate over available moves
+        for move in available_moves(board):
+            # Make the move for the opponent
+            board[move] = player
+            if stats is not None:
+                stats.node(depth+1, move)
+            # Recursively call expectimax for the player
+            score = expectimax(board, depth+1, PLAYER, stats)
+            # Undo the move
+            board[move] = EMPTY
+            # Add the score to the list
+            scores.append(score)
+        # Calculate the average score, summed exactly so that it does not depend
+        # on the order of the moves and rotations of a board score the same
+        return fsum(scores) / len(scores)
+
+
+# Bitboards: each player's squares are kept as a 9 bit mask, with bit i for square i
+
+# Mask with every square set
+FULL_MASK = 0b111111111
+# Mask of each winning combination
+WIN_MASKS = [sum(1 << i for i in combination) for combination in WINNING_COMBINATIONS]
+# For every mask, whether its squares contain a winning combination
+IS_WIN = bytes(any(mask & win == win for win in WIN_MASKS) for mask in range(1 << 9))
+# For every mask of empty squares, the squares in it in increasing order
+MOVES = [tuple(i for i in range(9) if mask >> i & 1) for mask in range(1 << 9)]
+
+
+# Function to convert a board to bitboards
+def to_masks(board):
+    """
+    Get the masks of the squares taken by the player and by the opponent.
+    """
+    player_mask = opponent_mask = 0
+    for i, square in enumerate(board):
+        if square == PLAYER:
+            player_mask |= 1 << i
+        elif square == OPPONENT:
+            opponent_mask |= 1 << i
+    return player_mask, opponent_mask
+
+
+# Function to perform expectimax search on bitboards
+def expectimax_masks(player_mask, opponent_mask, player_to_move, stats=None, depth=0):
+    """
+    Perform expectimax search on bitboards, giving the same scores as expectimax.
+    An optional SearchStats (see search_stats.py) records every move tried.
+    """
+    # Base case: if the game is over, return the evaluation of the current game state
+    if IS_WIN[player_mask]:
+        return 1
+    if IS_WIN[opponent_mask]:
+        return -1
+    empty = FULL_MASK & ~(player_mask | opponent_mask)
+    if not empty:
+        return 0
+
+    if player_to_move:
+        # Max player's turn
+        best_score = float('-inf')
+        for move in MOVES[empty]:
+            if stats is not None:
+                stats.node(depth+1, move)
+            score = expectimax_masks(player_mask | 1 << move, opponent_mask, False, stats, depth+1)
+            best_score = max(score, best_score)
+        return best_score
+    else:
+        # Chance node (opponent's turn), averaged exactly as in expectimax
+        scores = []
+        for move in MOVES[empty]:
+            if stats is not None:
+                stats.node(depth+1, move)
+            scores.append(expectimax_masks(player_mask, opponent_mask | 1 << move, True, stats, depth+1))
+        return fsum(scores) / len(scores)
+
+
+# Function to find the best move using expectimax
+def best_move(board, stats=None):
+    """
+    Find the move the opponent would make using expectimax, without changing the board.
+    Returns None if there is no move left.
+
+    An optional SearchStats (see search_stats.py) records every move tried.
+    """
+    # Search on bitboards, which the caller's board is converted to
+    player_mask, opponent_mask = to_masks(board)
+    move_found = None
+    best_average_score = float('-inf')
+    # Iterate over available moves
+    for move in MOVES[FULL_MASK & ~(player_mask | opponent_mask)]:
+        if stats is not None:
+            stats.node(0, move)
+        # Calculate the score of making the move for the opponent
+        score = expectimax_masks(player_mask, opponent_mask | 1 << move, True, stats)
+        # Update the best move and score
+        if score > best_average_score:
+            best_average_score = score
+            move_found = move
+    return move_found
+
+
+# Function to make the best move using expectimax
+def make_best_move_expectimax(board):
+    """
+    Make the best move for the opponent on the board using expectimax.
+    """
+    # Find the best move and make it for the opponent
+    move = best_move(board)
+    if move is not None:
+        board[move] = OPPONENT
+    return move
@@ -0,0 +1,390 @@
+# An m,n,k-game: Tic Tac Toe on a board with any number of rows and columns,
+# won by getting k in a row, with a depth-limited alpha-beta search for the
+# computer that returns the best move it found within a time budget
+import argparse
+import time
+
+import engine
+
+# Score of a win, far above anything the heuristic evaluation can reach
+WIN_SCORE = 10 ** 9
+# How often the search checks the clock, in nodes (must be one less than a power of 2)
+CLOCK_CHECK_INTERVAL = 1023
+
+# The four directions a line can run in: across, down and both diagonals
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+
+class MNKBoard:
+    """
+    Class to represent a board with rows x cols squares, won by the first
+    player with k of their symbols in a row, column or diagonal.
+
+    Squares are numbered row by row, and each player's squares are kept as
+    a bitmask with bit i for square i.
+    """
+
+    def __init__(self, rows=3, cols=3, k=3):
+        """
+        Initialize an empty board.
+        """
+        if rows < 1 or cols < 1 or not 1 <= k <= max(rows, cols):
+            raise ValueError(f"Cannot get {k} in a row on a {rows} x {cols} board")
+
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.size = rows * cols
+        self.full_mask = (1 << self.size) - 1
+        self.masks = {engine.PLAYER: 0, engine.OPPONENT: 0}
+
+        # Every run of k squares in a line, as a mask
+        self.windows = []
+        for row in range(rows):
+            for col in range(cols):
+                for d_row, d_col in DIRECTIONS:
+                    end_row = row + d_row * (k - 1)
+                    end_col = col + d_col * (k - 1)
+                    if 0 <= end_row < rows and 0 <= end_col < cols:
+                        self.windows.append(sum(1 << ((row + d_row * i) * cols + col + d_col * i) for i in range(k)))
+        # The windows through each square
+        self.square_windows = [[window for window in self.windows if window >> i & 1] for i in range(self.size)]
+
+    # Static method to create a board from a list of symbols
+    @staticmethod
+    def from_cells(cells, rows, cols, k):
+        """
+        Create a board from a list of symbols, row by row.
+        """
+        board = MNKBoard(rows, cols, k)
+        for i, symbol in enumerate(cells):
+            if symbol != engine.EMPTY:
+                board.make_move(i, symbol)
+        return board
+
+    # Method to get the board as a list of symbols
+    def cells(self):
+        """
+        Get the symbol on every square, row by row.
+        """
+        return [self.symbol_at(i) for i in range(self.size)]
+
+    # Method to get the symbol on a square
+    def symbol_at(self, square):
+        """
+        Get the symbol on a square.
+        """
+        for symbol, mask in self.masks.items():
+            if mask >> square & 1:
+                return symbol
+        return engine.EMPTY
+
+    # Method to get the mask of the empty squares
+    def empty_mask(self):
+        """
+        Get the mask of the empty squares.
+        """
+        return self.full_mask & ~(self.masks[engine.PLAYER] | self.masks[engine.OPPONENT])
+
+    # Method to get available moves on the board
+    def available_moves(self):
+        """
+        Get available moves on the board.
+        """
+        empty = self.empty_mask()
+        return [i for i in range(self.size) if empty >> i & 1]
+
+    # Method to make a move on the board
+    def make_move(self, move, symbol):
+        """
+        Make a move on the board.
+        """
+        self.masks[symbol] |= 1 << move
+
+    # Method to undo a move
+    def undo_move(self, move, symbol):
+        """
+        Undo a move on the board.
+        """
+        self.masks[symbol] &= ~(1 << move)
+
+    # Method to check if a move won the game
+    def wins_at(self, move, symbol):
+        """
+        Check if the symbol on a square is part of k in a row.
+        """
+        mask = self.masks[symbol]
+        return any(mask & window == window for window in self.square_windows[move])
+
+    # Method to check if a player has won
+    def check_winner(self, symbol):
+        """
+        Check if a player has won.
+        """
+        mask = self.masks[symbol]
+        return any(mask & window == window for window in self.windows)
+
+    # Method to check if the game is over
+    def game_over(self):
+        """
+        Check if the game is over.
+        """
+        return (self.check_winner(engine.PLAYER) or self.check_winner(engine.OPPONENT)
+                or not self.empty_mask())
+
+    # Method to estimate how good a position is
+    def evaluate(self, symbol, other):
+        """
+        Estimate how good the position is for symbol. Every window that only
+        one player has symbols in counts for that player, more so the more
+        symbols they have in it.
+        """
+        mine = self.masks[symbol]
+        theirs = self.masks[other]
+        score = 0
+        for window in self.windows:
+            if not mine & window:
+                if theirs & window:
+                    score -= 4 ** (theirs & window).bit_count()
+            elif not theirs & window:
+                score += 4 ** (mine & window).bit_count()
+        return score
+
+    def __str__(self):
+        return "\n".join(
+            "|".join(self.symbol_at(row * self.cols + col) for col in range(self.cols))
+            for row in range(self.rows)
+        )
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside the search when it runs out of time or is cancelled.
+    """
+
+
+class SearchResult:
+    """
+    Class to represent the outcome of a search.
+    """
+
+    def __init__(self, move, score, depth, nodes, elapsed, complete):
+        """
+        :param move: The best move found, or None if there was no move.
+        :param score: Its score from the point of view of the player moving.
+        :param depth: The deepest search that finished.
+        :param nodes: How many positions were searched.
+        :param elapsed: How long the search took, in seconds.
+        :param complete: Whether the search saw the end of every line of play.
+        """
+        self.move = move
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.complete = complete
+
+    def __str__(self):
+        return (f"move {self.move} score {self.score} depth {self.depth}"
+                f"{' (complete)' if self.complete else ''}, "
+                f"{self.nodes} nodes in {self.elapsed:.3f}s")
+
+
+class AlphaBetaSearch:
+    """
+    Class to find a move with minimax and alpha-beta pruning, like the
+    JavaScript version in minimax_alpha_beta_prunning, but limited in depth
+    and time.
+
+    The search deepens one move at a time, keeping the best move of the
+    deepest search that finished when it runs out of time. Moves are tried
+    best first: the best move of the previous depth at the root, then by
+    how often a move caused a cut-off, then by how many lines run through
+    its square.
+    """
+
+    def __init__(self, board, symbol, other, time_limit=1.0, max_depth=None):
+        """
+        :param board: The board to search, which is restored before the search returns.
+        :param symbol: The symbol of the player to move.
+        :param other: The symbol of the other player.
+        :param time_limit: The most time the search may take, in seconds, or None for no limit.
+        :param max_depth: The deepest search to try, or None to search until the end of the game.
+        """
+        self.board = board
+        self.symbol = symbol
+        self.other = other
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+
+        # Progress, which can be read from another thread while the search runs
+        self.nodes = 0
+        self.depth = 0
+        self.deadline = None
+        self.cancelled = False
+        # How useful each move has been at causing cut-offs
+        self.history = [0] * board.size
+        # Squares with more lines through them come first among equals
+        self.centrality = [len(windows) for windows in board.square_windows]
+
+    # Method to order the moves from a position
+    def ordered_moves(self, empty):
+        """
+        Get the empty squares, most promising first.
+        """
+        moves = [i for i in range(self.board.size) if empty >> i & 1]
+        moves.sort(key=lambda move: (self.history[move], self.centrality[move]), reverse=True)
+        return moves
+
+    # Method to perform minimax search with alpha-beta pruning
+    def minimax(self, depth, ply, is_maximizing, alpha, beta, last_move):
+        """
+        Perform minimax search with alpha-beta pruning, scoring the position
+        after last_move from the point of view of the player to move at the root.
+        """
+        self.nodes += 1
+        if not self.nodes & CLOCK_CHECK_INTERVAL and (
+                self.cancelled or self.deadline is not None and time.perf_counter() > self.deadline):
+            raise SearchTimeout()
+
+        board = self.board
+        # Check if the last move won, preferring quicker wins and slower losses
+        if is_maximizing:
+            if board.wins_at(last_move, self.other):
+                return -(WIN_SCORE - ply)
+        elif board.wins_at(last_move, self.symbol):
+            return WIN_SCORE - ply
+
+        empty = board.empty_mask()
+        if not empty:
+            return 0
+        if depth == 0:
+            return board.evaluate(self.symbol, self.other)
+
+        symbol = self.symbol if is_maximizing else self.other
+        best_score = float('-inf') if is_maximizing else float('inf')
+        for move in self.ordered_moves(empty):
+            board.make_move(move, symbol)
+            try:
+                score = self.minimax(depth - 1, ply + 1, not is_maximizing, alpha, beta, move)
+            finally:
+                board.undo_move(move, symbol)
+
+            if is_maximizing:
+                best_score = max(score, best_score)
+                alpha = max(alpha, best_score)
+            else:
+                best_score = min(score, best_score)
+                beta = min(beta, best_score)
+            # Alpha-beta pruning
+            if beta <= alpha:
+                self.history[move] += depth * depth
+                break
+        return best_score
+
+    # Method to search one depth from the root
+    def search_root(self, depth, first_move):
+        """
+        Search every move at the root to the given depth, trying first_move first.
+        """
+        moves = self.ordered_moves(self.board.empty_mask())
+        if first_move is not None:
+            moves.remove(first_move)
+            moves.insert(0, first_move)
+
+        best_score = float('-inf')
+        best = None
+        alpha = float('-inf')
+        for move in moves:
+            self.board.make_move(move, self.symbol)
+            try:
+                score = self.minimax(depth - 1, 1, False, alpha, float('inf'), move)
+            finally:
+                self.board.undo_move(move, self.symbol)
+            if score > best_score:
+                best_score = score
+                best = move
+                alpha = max(alpha, best_score)
+        return best, best_score
+
+    # Method to stop the search early
+    def cancel(self):
+        """
+        Stop the search, which may be running in another thread, as soon as it next checks the clock.
+        """
+        self.cancelled = True
+
+    # Method to run the search
+    def search(self):
+        """
+        Deepen the search until it reaches the end of the game, max_depth
+        or the time limit, and return the best move of the deepest search
+        that finished.
+        """
+        start = time.perf_counter()
+        if self.time_limit is not None:
+            self.deadline = start + self.time_limit
+
+        moves = self.board.available_moves()
+        if not moves:
+            return SearchResult(None, 0, 0, 0, 0.0, True)
+
+        # Play something sensible even if not even depth 1 finishes in time
+        move, score = self.ordered_moves(self.board.empty_mask())[0], 0
+        complete = False
+        max_depth = len(moves) if self.max_depth is None else min(self.max_depth, len(moves))
+
+        for depth in range(1, max_depth + 1):
+            if self.cancelled:
+                break
+            try:
+                move, score = self.search_root(depth, move)
+            except SearchTimeout:
+                break
+            self.depth = depth
+            # A forced win or loss, or a search to the end of the game, cannot change any more
+            if abs(score) > WIN_SCORE - self.board.size or depth == len(moves):
+                complete = True
+                break
+
+        return SearchResult(move, score, self.depth, self.nodes, time.perf_counter() - start, complete)
+
+
+# Function to find the best move on an m,n,k board
+def best_move(board, symbol=engine.OPPONENT, time_limit=1.0, max_depth=None):
+    """
+    Find a move for symbol on the board using alpha-beta search within the time limit.
+    """
+    other = engine.PLAYER if symbol == engine.OPPONENT else engine.OPPONENT
+    return AlphaBetaSearch(board, symbol, other, time_limit, max_depth).search()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch the computer play an m,n,k-game against itself.")
+    parser.add_argument("--rows", type=int, default=4, help="Number of rows")
+    parser.add_argument("--cols", type=int, default=4, help="Number of columns")
+    parser.add_argument("-k", type=int, default=3, help="Number in a row needed to win")
+    parser.add_argument("--time", type=float, default=1.0, help="Time budget per move, in seconds")
+    parser.add_argument("--depth", type=int, default=None, help="Deepest search per move")
+    args = parser.parse_args()
+
+    board = MNKBoard(args.rows, args.cols, args.k)
+    symbol = engine.PLAYER
+    while not board.game_over():
+        result = best_move(board, symbol, args.time, args.depth)
+        board.make_move(result.move, symbol)
+        print(f"{symbol}: {result}")
+        print(board)
+        print()
+        symbol = engine.OPPONENT if symbol == engine.PLAYER else engine.PLAYER
+
+    if board.check_winner(engine.PLAYER):
+        print(f"{engine.PLAYER} wins")
+    elif board.check_winner(engine.OPPONENT):
+        print(f"{engine.OPPONENT} wins")
+    else:
+        print("It's a tie")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+# A precomputed table of the expectimax move for every position, so that the
+# computer's moves become a lookup instead of a full search of the game tree
+import mmap
+import os
+from math import fsum
+
+import engine
+
+# Where the table is kept between runs
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'expectimax_moves.bin')
+# Marks the start of a table file
+MAGIC = b'TTT3'
+# Number of boards, with each square empty, 'X' or 'O'
+NUM_BOARDS = 3 ** 9
+
+# The digit each symbol has when a board is read as a base 3 number
+DIGITS = {engine.EMPTY: 0, engine.PLAYER: 1, engine.OPPONENT: 2}
+
+# The 8 symmetries of the board (rotations and reflections), each given as
+# the square of the original board that ends up on each square
+SYMMETRIES = [
+    (0, 1, 2, 3, 4, 5, 6, 7, 8),
+    (6, 3, 0, 7, 4, 1, 8, 5, 2),
+    (8, 7, 6, 5, 4, 3, 2, 1, 0),
+    (2, 5, 8, 1, 4, 7, 0, 3, 6),
+    (2, 1, 0, 5, 4, 3, 8, 7, 6),
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),
+    (0, 3, 6, 1, 4, 7, 2, 5, 8),
+    (8, 5, 2, 7, 4, 1, 6, 3, 0),
+]
+
+
+# Function to number a board
+def board_index(board):
+    """
+    Read the board as a base 3 number, giving each board its own index below NUM_BOARDS.
+    """
+    index = 0
+    for square in board:
+        index = index * 3 + DIGITS[square]
+    return index
+
+
+# Function to find the canonical index of a board
+def canonical_index(board):
+    """
+    Get the smallest index of the board under any of its symmetries, which
+    is the same for every rotation and reflection of the board.
+    """
+    return min(board_index([board[i] for i in symmetry]) for symmetry in SYMMETRIES)
+
+
+class TableBuilder:
+    """
+    Class to run expectimax over every position once, with a transposition
+    table of the scores already worked out. Rotations and reflections of a
+    board have the same score, so they share one entry.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty transposition table.
+        """
+        # Maps the canonical index of a board and the symbol to move to its score
+        self.scores = {}
+
+    # Method to perform expectimax search with the transposition table
+    def expectimax(self, board, player):
+        """
+        Perform expectimax search, scoring each position once.
+        """
+        key = (canonical_index(board), player)
+        if key in self.scores:
+            return self.scores[key]
+
+        # Base case: if the game is over, return the evaluation of the current game state
+        if engine.game_over(board):
+            score = engine.evaluate(board)
+        elif player == engine.PLAYER:
+            # Max player's turn
+            score = max(self.child_scores(board, player, engine.OPPONENT))
+        else:
+            # Chance node (opponent's turn), scored as the average of its moves,
+            # summed exactly as in engine.expectimax so that the order the
+            # moves of a rotated board come in makes no difference
+            scores = self.child_scores(board, player, engine.PLAYER)
+            score = fsum(scores) / len(scores)
+
+        self.scores[key] = score
+        return score
+
+    # Method to score the moves from a board
+    def child_scores(self, board, player, next_player):
+        """
+        Score each available move, in the same order as engine.available_moves.
+        """
+        scores = []
+        for move in engine.available_moves(board):
+            board[move] = player
+            scores.append(self.expectimax(board, next_player))
+            board[move] = engine.EMPTY
+        return scores
+
+    # Method to find the best move using the transposition table
+    def best_move(self, board):
+        """
+        Find the same move as engine.best_move, scoring the moves with the transposition table.
+        """
+        board = list(board)
+        move_found = None
+        best_average_score = float('-inf')
+        for move, score in zip(engine.available_moves(board),
+                               self.child_scores(board, engine.OPPONENT, engine.PLAYER)):
+            # Ties go to the first move, as in engine.best_move
+            if score > best_average_score:
+                best_average_score = score
+                move_found = move
+        return move_found
+
+
+class MoveTable:
+    """
+    Class to look up the computer's move in a precomputed table.
+
+    The table has a byte for every board, holding the move plus 1 for the
+    positions where the computer is to move and 0 for the rest, which are
+    left to engine.best_move, whose moves the table holds exactly.
+    """
+
+    def __init__(self, data):
+        """
+        Initialize the table from the bytes of a table file.
+        """
+        if len(data) != len(MAGIC) + NUM_BOARDS or data[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a move table file")
+        self.data = data
+
+    # Static method to build the table
+    @staticmethod
+    def build():
+        """
+        Build the table by running expectimax once over every position where
+        the computer can be to move: with one more 'X' than 'O', or with as
+        many of each when the computer plays first.
+        """
+        builder = TableBuilder()
+        data = bytearray(MAGIC) + bytearray(NUM_BOARDS)
+        symbols = list(DIGITS)
+
+        for index in range(NUM_BOARDS):
+            # Turn the index back into a board
+            board = []
+            for _ in range(9):
+                index, digit = divmod(index, 3)
+                board.append(symbols[digit])
+            board.reverse()
+
+            if board.count(engine.PLAYER) - board.count(engine.OPPONENT) not in (0, 1) or engine.game_over(board):
+                continue
+            data[len(MAGIC) + board_index(board)] = builder.best_move(board) + 1
+
+        return MoveTable(bytes(data))
+
+    # Method to save the table
+    def save(self, path=DEFAULT_PATH):
+        """
+        Save the table to a file.
+        """
+        with open(path, 'wb') as f:
+            f.write(self.data)
+
+    # Static method to load a saved table
+    @staticmethod
+    def load(path=DEFAULT_PATH):
+        """
+        Load a saved table by mapping its file into memory.
+        """
+        with open(path, 'rb') as f:
+            return MoveTable(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    # Static method to load the table, building it the first time
+    @staticmethod
+    def load_or_build(path=DEFAULT_PATH):
+        """
+        Load the table from a file, building and saving it first if the file is missing or invalid.
+        """
+        try:
+            return MoveTable.load(path)
+        except (OSError, ValueError):
+            table = MoveTable.build()
+            try:
+                table.save(path)
+            except OSError:
+                # The table still works from memory if it cannot be saved
+                pass
+            return table
+
+    # Method to find the best move
+    def best_move(self, board):
+        """
+        Find the move the opponent would make using expectimax, without changing the board.
+        Returns None if there is no move left.
+        """
+        entry = self.data[len(MAGIC) + board_index(board)]
+        if entry:
+            return entry - 1
+        # Not a position the table covers, so search it
+        return engine.best_move(board)
+
+
+# Entry point of the program
+if __name__ == "__main__":
+    # Rebuild the table and save it next to this file
+    MoveTable.build().save()
+    print(f"Saved the move table to {DEFAULT_PATH}")
@@ -1,18 +1,35 @@
+# Import the argparse module to read the board size from the command line
+import argparse
+# Import the time module to time the computer's searches
+import time
+# Import the thread pool the computer searches in, away from the window
+from concurrent.futures import ThreadPoolExecutor
 # Import the tkinter library with alias tk
 import tkinter as tk
 # Import the messagebox module from tkinter
 from tkinter import messagebox
-# Import the random module
-import random
+# Import the headless game engine
+import engine
+# Import the precomputed table of moves
+from move_table import MoveTable
+# Import the search for boards other than 3 x 3
+from mnk_game import AlphaBetaSearch, MNKBoard
+
+# How often the window checks on a search running in the background, in milliseconds
+POLL_INTERVAL = 50
 
 # Define a class for the Tic Tac Toe game
 class TicTacToe:
     """
     Class to represent a Tic Tac Toe game.
+
+    On the classic 3 x 3 board the computer plays expectimax; on other boards
+    it uses a time-limited alpha-beta search. With background set, the
+    computer searches in a worker thread while the window stays responsive.
     """
 
     # Constructor method to initialize the game
-    def __init__(self):
+    def __init__(self, rows=3, cols=3, k=3, time_limit=1.0, background=True):
         """
         Initialize the game.
         """
@@ -22,38 +39,78 @@ class TicTacToe:
         self.root.title("Tic Tac Toe")
         # Initialize a list to store buttons
         self.buttons = []
+        # Set the size of the board and the number in a row needed to win
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        # Check the size early so a bad one fails before the game starts
+        MNKBoard(rows, cols, k)
         # Initialize the board with empty spaces
-        self.board = [' ']*9
+        self.board = [engine.EMPTY] * (rows * cols)
         # Set the symbol for the player
-        self.player = 'X'
+        self.player = engine.PLAYER
         # Set the symbol for the opponent
-        self.opponent = 'O'
+        self.opponent = engine.OPPONENT
+        # Set the time the computer may take per move on boards other than 3 x 3
+        self.time_limit = time_limit
+        # Set whether the computer searches in the background
+        self.background = background
+        # Load the table of the opponent's moves on the classic board, building it on the first run
+        self.moves = MoveTable.load_or_build() if self.is_classic() else None
+
+        # The search in progress, if any, and when it started
+        self.executor = ThreadPoolExecutor(max_workers=1) if background else None
+        self.future = None
+        self.search = None
+        self.search_started = 0.0
+        # Counts the games started, so that a search from an earlier game is ignored
+        self.generation = 0
 
         # Create buttons for the game grid
-        for i in range(3):
-            for j in range(3):
+        for i in range(rows):
+            for j in range(cols):
                 # Create a button at position (i, j)
-                button = tk.Button(self.root, text='', width=10, height=4, font=('Arial', 20),
-                                   # Lambda function to pass the position (i*3+j) to make_move_and_update
-                                   command=lambda i=i, j=j: self.make_move_and_update(i*3+j))
+                button = tk.Button(self.root, text='', width=10 if cols <= 3 else 5, height=4 if rows <= 3 else 2,
+                                   font=('Arial', 20),
+                                   # Lambda function to pass the position (i*cols+j) to make_move_and_update
+                                   command=lambda i=i, j=j: self.make_move_and_update(i*cols+j))
                 # Place the button in the grid
                 button.grid(row=i, column=j)
                 # Add the button to the list of buttons
                 self.buttons.append(button)
 
+        # Create a label showing the progress of the computer's search
+        self.status = tk.Label(self.root, text="Your move", anchor='w')
+        self.status.grid(row=rows, column=0, columnspan=max(cols - 1, 1), sticky='we')
+        # Create a button to start a new game
+        tk.Button(self.root, text="New Game", command=self.new_game).grid(row=rows, column=max(cols - 1, 1))
+        # Stop any search when the window is closed
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+    # Method to check if the board is the classic 3 x 3 one
+    def is_classic(self):
+        """
+        Check if the game is played on the classic 3 x 3 board.
+        """
+        return (self.rows, self.cols, self.k) == (3, 3, 3)
+
     # Method to make a move and update the game state
     def make_move_and_update(self, move):
         """
         Make a move and update the game state.
         """
-        # Check if the chosen move is valid and the game is not over
-        if self.board[move] == ' ' and not self.game_over():
+        # Check if the chosen move is valid, the game is not over and the computer is not thinking
+        if self.board[move] == engine.EMPTY and not self.game_over() and self.future is None:
             # Make the move for the player
             self.make_move(move, self.player)
             # Update the GUI board
             self.update_board()
             # Check if the game is over after the player's move
             if not self.game_over():
+                if self.background:
+                    # Search for the opponent's move without blocking the window
+                    self.start_search()
+                    return
                 # Make the best move for the opponent using the Expectimax algorithm
                 self.make_best_move_expectimax()
                 # Update the GUI board after the opponent's move
@@ -79,110 +136,115 @@ class TicTacToe:
         # Set the chosen position on the board to the player's symbol
         self.board[move] = player
 
-    # Method to get available moves on the board
-    def available_moves(self):
+    # Method to get the board as an m,n,k board
+    def mnk_board(self):
         """
-        Get available moves on the board.
+        Get the current board as an MNKBoard.
         """
-        # Return a list of indices where the board contains an empty space
-        return [i for i in range(9) if self.board[i] == ' ']
+        return MNKBoard.from_cells(self.board, self.rows, self.cols, self.k)
 
     # Method to check if a player has won
     def check_winner(self, player):
         """
         Check if a player has won.
         """
-        # Define winning combinations
-        winning_combinations = [(0, 1, 2), (3, 4, 5), (6, 7, 8),
-                                (0, 3, 6), (1, 4, 7), (2, 5, 8),
-                                (0, 4, 8), (2, 4, 6)]
-        # Check if any winning combination is achieved by the player
-        for combination in winning_combinations:
-            if all(self.board[i] == player for i in combination):
-                return True
-        return False
+        # Let the engine check the current board
+        if self.is_classic():
+            return engine.check_winner(self.board, player)
+        return self.mnk_board().check_winner(player)
 
     # Method to check if the game is over
     def game_over(self):
         """
         Check if the game is over.
         """
-        # Check if either player has won or if the board is full
-        return self.check_winner(self.player) or self.check_winner(self.opponent) or ' ' not in self.board
+        # Let the engine check the current board
+        if self.is_classic():
+            return engine.game_over(self.board)
+        return self.mnk_board().game_over()
 
-    # Method to evaluate the game state
-    def evaluate(self):
+    # Method to create a search for the opponent's move
+    def create_search(self):
         """
-        Evaluate the game state.
+        Create a function that finds the opponent's move, along with the
+        AlphaBetaSearch it runs, if any, so that it can be watched and cancelled.
         """
-        # If player wins, return 1; if opponent wins, return -1; if it's a tie, return 0
-        if self.check_winner(self.player):
-            return 1
-        elif self.check_winner(self.opponent):
-            return -1
-        else:
-            return 0
+        if self.is_classic():
+            # Look up the best move on a copy of the board
+            board = list(self.board)
+            return (lambda: self.moves.best_move(board)), None
+        search = AlphaBetaSearch(self.mnk_board(), self.opponent, self.player, self.time_limit)
+        return (lambda: search.search().move), search
+
+    # Method to make the best move using expectimax
+    def make_best_move_expectimax(self):
+        """
+        Make the best move using expectimax.
+        """
+        # Find the best move and make it for the opponent
+        find_move, _ = self.create_search()
+        self.make_move(find_move(), self.opponent)
 
-    # Method to perform expectimax search
-    def expectimax(self, depth, player):
+    # Method to start searching for the opponent's move in the background
+    def start_search(self):
         """
-        Perform expectimax search.
+        Start searching for the opponent's move in the worker thread.
         """
-        # Base case: if the game is over, return the evaluation of the current game state
+        find_move, self.search = self.create_search()
+        self.search_started = time.perf_counter()
+        self.future = self.executor.submit(find_move)
+        self.status.config(text="Thinking...")
+        # Check on the search from the Tkinter event loop
+        self.root.after(POLL_INTERVAL, self.poll_search, self.generation)
+
+    # Method to check on the background search
+    def poll_search(self, generation):
+        """
+        Make the opponent's move if the search has finished, otherwise show its progress.
+        """
+        # Ignore searches from a game that has since been replaced
+        if generation != self.generation or self.future is None:
+            return
+
+        elapsed = time.perf_counter() - self.search_started
+        nodes = f"{self.search.nodes} nodes, " if self.search is not None else ""
+        if not self.future.done():
+            # Show the progress so far and check again later
+            self.status.config(text=f"Thinking... {nodes}{elapsed:.1f}s")
+            self.root.after(POLL_INTERVAL, self.poll_search, generation)
+            return
+
+        move = self.future.result()
+        self.future = None
+        self.search = None
+        self.status.config(text=f"Searched {nodes}{elapsed:.2f}s. Your move")
+        # Make the opponent's move and update the GUI board
+        self.make_move(move, self.opponent)
+        self.update_board()
+        # If the game is over after the opponent's move, show the result
         if self.game_over():
-            return self.evaluate()
-
-        if player == self.player:
-            # Max player's turn
-            best_score = float('-inf')
-            # Iterate over available moves
-            for move in self.available_moves():
-                # Make the move for the player
-                self.make_move(move, player)
-                # Recursively call expectimax for the opponent
-                score = self.expectimax(depth+1, self.opponent)
-                # Undo the move
-                self.make_move(move, ' ')
-                # Update the best score
-                best_score = max(score, best_score)
-            return best_score
-        else:
-            # Chance node (opponent's turn)
-            scores = []
-            # Iterate over available moves
-            for move in self.available_moves():
-                # Make the move for the opponent
-                self.make_move(move, player)
-                # Recursively call expectimax for the player
-                score = self.expectimax(depth+1, self.player)
-                # Undo the move
-                self.make_move(move, ' ')
-                # Add the score to the list
-                scores.append(score)
-            # Calculate the average score
-            return sum(scores) / len(scores)
+            self.show_result()
 
-    # Method to make the best move using expectimax
-    def make_best_move_expectimax(self):
+    # Method to stop the background search
+    def cancel_search(self):
         """
-        Make the best move using expectimax.
+        Cancel the search in progress, if any.
+        """
+        if self.search is not None:
+            self.search.cancel()
+        self.future = None
+        self.search = None
+
+    # Method to start a new game
+    def new_game(self):
+        """
+        Start a new game, dropping any search still running for the old one.
         """
-        best_move = None
-        best_average_score = float('-inf')
-        # Iterate over available moves
-        for move in self.available_moves():
-            # Make the move for the opponent
-            self.make_move(move, self.opponent)
-            # Calculate the score using expectimax
-            score = self.expectimax(0, self.player)
-            # Undo the move
-            self.make_move(move, ' ')
-            # Update the best move and score
-            if score > best_average_score:
-                best_average_score= score
-                best_move = move
-        # Make the best move for the opponent
-        self.make_move(best_move, self.opponent)
+        self.generation += 1
+        self.cancel_search()
+        self.board = [engine.EMPTY] * (self.rows * self.cols)
+        self.update_board()
+        self.status.config(text="Your move")
 
     # Method to show the game result
     def show_result(self):
@@ -198,6 +260,16 @@ class TicTacToe:
             result = "It's a tie!"
         messagebox.showinfo("Game Over", result)
 
+    # Method to close the window
+    def close(self):
+        """
+        Stop any search and close the window.
+        """
+        self.cancel_search()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+        self.root.destroy()
+
     # Method to run the game
     def run(self):
         """
@@ -208,6 +280,15 @@ class TicTacToe:
 
 # Entry point of the program
 if __name__ == "__main__":
+    # Read the board size and search options from the command line
+    parser = argparse.ArgumentParser(description="Play Tic Tac Toe against the computer.")
+    parser.add_argument("--rows", type=int, default=3, help="Number of rows")
+    parser.add_argument("--cols", type=int, default=3, help="Number of columns")
+    parser.add_argument("-k", type=int, default=3, help="Number in a row needed to win")
+    parser.add_argument("--time", type=float, default=1.0, help="Time the computer may take per move on other boards")
+    parser.add_argument("--blocking", action="store_true", help="Search in the window's thread, as before")
+    args = parser.parse_args()
+
     # Create a Tic Tac Toe game instance and run it
-    game = TicTacToe()
+    game = TicTacToe(args.rows, args.cols, args.k, args.time, background=not args.blocking)
     game.run()
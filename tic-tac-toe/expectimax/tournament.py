@@ -0,0 +1,253 @@
+# Plays games between computer players without a window, across a pool of
+# processes, to measure how well and how quickly each one plays
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import engine
+from mnk_game import AlphaBetaSearch, MNKBoard
+from move_table import MoveTable
+
+# Swaps the symbols on a board, so a player written to play 'O' can play 'X'
+SWAP = {engine.PLAYER: engine.OPPONENT, engine.OPPONENT: engine.PLAYER, engine.EMPTY: engine.EMPTY}
+
+# The move table, loaded once per process
+_move_table = None
+
+
+# Function to play a random move
+def random_agent(board, symbol, rng):
+    """
+    Pick one of the available moves at random.
+    """
+    return rng.choice(engine.available_moves(board))
+
+
+# Function to play the expectimax move
+def expectimax_agent(board, symbol, rng):
+    """
+    Pick the move the expectimax engine would make, searching the tree on every move.
+    """
+    # The engine always moves for the opponent, so swap the symbols to play the other side
+    if symbol != engine.OPPONENT:
+        board = [SWAP[square] for square in board]
+    return engine.best_move(board)
+
+
+# Function to play the expectimax move from the precomputed table
+def table_agent(board, symbol, rng):
+    """
+    Pick the move the expectimax engine would make, looking it up in the move table.
+    Positions the table does not cover are searched instead.
+    """
+    global _move_table
+    if _move_table is None:
+        _move_table = MoveTable.load_or_build()
+    if symbol != engine.OPPONENT:
+        board = [SWAP[square] for square in board]
+    return _move_table.best_move(board)
+
+
+# Function to play the minimax move
+def minimax_agent(board, symbol, rng):
+    """
+    Pick the move found by a complete minimax search with alpha-beta pruning.
+    """
+    other = SWAP[symbol]
+    return AlphaBetaSearch(MNKBoard.from_cells(board, 3, 3, 3), symbol, other, time_limit=None).search().move
+
+
+# The players that can take part, by name
+AGENTS = {
+    "random": random_agent,
+    "expectimax": expectimax_agent,
+    "table": table_agent,
+    "minimax": minimax_agent,
+}
+
+
+# Function to play one game
+def play_game(x_agent, o_agent, rng):
+    """
+    Play a game between two agents, with x_agent moving first.
+
+    :return: The winning symbol (None for a tie), along with how long each
+             of x_agent's and o_agent's moves took, in seconds.
+    """
+    board = engine.new_board()
+    agents = {engine.PLAYER: x_agent, engine.OPPONENT: o_agent}
+    latencies = {engine.PLAYER: [], engine.OPPONENT: []}
+    symbol = engine.PLAYER
+
+    while not engine.game_over(board):
+        start = time.perf_counter()
+        move = agents[symbol](board, symbol, rng)
+        latencies[symbol].append(time.perf_counter() - start)
+        board[move] = symbol
+        symbol = SWAP[symbol]
+
+    if engine.check_winner(board, engine.PLAYER):
+        winner = engine.PLAYER
+    elif engine.check_winner(board, engine.OPPONENT):
+        winner = engine.OPPONENT
+    else:
+        winner = None
+    return winner, latencies[engine.PLAYER], latencies[engine.OPPONENT]
+
+
+# Function to play a range of games in a worker process
+def play_games(first_agent, second_agent, start, count, seed):
+    """
+    Play games start to start + count - 1, with the agents taking turns to
+    move first. Each game has its own random generator, so the results do
+    not depend on how the games are split between processes.
+
+    :return: The first agent's wins, draws and losses, and the latencies of
+             each agent's moves.
+    """
+    agents = (AGENTS[first_agent], AGENTS[second_agent])
+    wins = draws = losses = 0
+    first_latencies = []
+    second_latencies = []
+
+    for game in range(start, start + count):
+        rng = random.Random(seed * 1_000_003 + game)
+        # The first agent plays 'X' in even games and 'O' in odd ones
+        first_symbol = engine.PLAYER if game % 2 == 0 else engine.OPPONENT
+        if first_symbol == engine.PLAYER:
+            winner, first_moves, second_moves = play_game(agents[0], agents[1], rng)
+        else:
+            winner, second_moves, first_moves = play_game(agents[1], agents[0], rng)
+
+        if winner is None:
+            draws += 1
+        elif winner == first_symbol:
+            wins += 1
+        else:
+            losses += 1
+        first_latencies.extend(first_moves)
+        second_latencies.extend(second_moves)
+
+    return wins, draws, losses, first_latencies, second_latencies
+
+
+# Function to find a percentile
+def percentile(values, p):
+    """
+    Get the p-th percentile of sorted values, using the nearest rank.
+    """
+    if not values:
+        return 0.0
+    rank = max(1, -(-p * len(values) // 100))
+    return values[min(rank, len(values)) - 1]
+
+
+class TournamentReport:
+    """
+    Class to represent the results of a tournament between two agents.
+    """
+
+    def __init__(self, first_agent, second_agent, games, wins, draws, losses, elapsed,
+                 first_latencies, second_latencies):
+        """
+        Initialize the report, with wins, draws and losses from the first agent's point of view.
+        """
+        self.first_agent = first_agent
+        self.second_agent = second_agent
+        self.games = games
+        self.wins = wins
+        self.draws = draws
+        self.losses = losses
+        self.elapsed = elapsed
+        self.latencies = {first_agent: sorted(first_latencies), second_agent: sorted(second_latencies)}
+        if first_agent == second_agent:
+            self.latencies[first_agent] = sorted(first_latencies + second_latencies)
+
+    # Method to get the number of games played per second
+    def games_per_second(self):
+        """
+        Get the number of games played per second.
+        """
+        return self.games / self.elapsed if self.elapsed > 0 else 0.0
+
+    # Method to get an agent's move latency percentiles
+    def latency_percentiles(self, agent, percentiles=(50, 90, 99, 100)):
+        """
+        Get the latency percentiles of an agent's moves, in seconds.
+        """
+        return {p: percentile(self.latencies[agent], p) for p in percentiles}
+
+    def __str__(self):
+        games = max(self.games, 1)
+        lines = [
+            f"{self.games} games of {self.first_agent} vs {self.second_agent} in {self.elapsed:.2f}s "
+            f"({self.games_per_second():.1f} games/sec)",
+            f"{self.first_agent}: {self.wins / games:.1%} wins, {self.draws / games:.1%} draws, "
+            f"{self.losses / games:.1%} losses",
+        ]
+        for agent in self.latencies:
+            stats = ", ".join(f"p{p} {seconds * 1000:.3f}ms" for p, seconds in self.latency_percentiles(agent).items())
+            lines.append(f"{agent} move latency: {stats}")
+        return "\n".join(lines)
+
+
+# Function to run a tournament
+def run_tournament(first_agent, second_agent, games=1000, workers=None, seed=0, batch_size=50):
+    """
+    Play games between two agents across a pool of processes.
+
+    :param first_agent: The name of one of the AGENTS.
+    :param second_agent: The name of another, or the same one.
+    :param games: How many games to play, with the agents taking turns to move first.
+    :param workers: How many processes to use, defaulting to one per CPU.
+    :param seed: Seed for the random agents.
+    :param batch_size: How many games a process plays at a time.
+    """
+    for agent in (first_agent, second_agent):
+        if agent not in AGENTS:
+            raise ValueError(f"Unknown agent {agent!r}, expected one of {', '.join(AGENTS)}")
+
+    workers = workers or os.cpu_count() or 1
+    wins = draws = losses = 0
+    first_latencies = []
+    second_latencies = []
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(play_games, first_agent, second_agent, batch_start,
+                            min(batch_size, games - batch_start), seed)
+            for batch_start in range(0, games, batch_size)
+        ]
+        for future in futures:
+            batch_wins, batch_draws, batch_losses, batch_first, batch_second = future.result()
+            wins += batch_wins
+            draws += batch_draws
+            losses += batch_losses
+            first_latencies.extend(batch_first)
+            second_latencies.extend(batch_second)
+
+    return TournamentReport(first_agent, second_agent, games, wins, draws, losses,
+                            time.perf_counter() - start, first_latencies, second_latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play Tic Tac Toe games between two computer players.")
+    parser.add_argument("first_agent", choices=sorted(AGENTS))
+    parser.add_argument("second_agent", choices=sorted(AGENTS))
+    parser.add_argument("--games", type=int, default=1000, help="Number of games to play")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the random players")
+    args = parser.parse_args()
+
+    # Build the move table once up front rather than in every process
+    if "table" in (args.first_agent, args.second_agent):
+        MoveTable.load_or_build()
+
+    print(run_tournament(args.first_agent, args.second_agent, args.games, args.workers, args.seed))
+
+
+if __name__ == "__main__":
+    main()